@@ -0,0 +1,306 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import register, Integrator, rms
+from ode_solvers.RungeKutta import RungeKutta
+from ode_solvers.BDF import change_D
+from ode_solvers.Stats import Stats
+from numpy import array, asarray, zeros, empty, ones, arange, tensordot, \
+                  maximum, isfinite, array_equal, argmax, nextafter, \
+                  searchsorted, errstate, inf, newaxis
+
+MAX_ORDER   = 12
+START_ORDER = 4
+MIN_FACTOR  = 0.2
+MAX_FACTOR  = 10.
+
+# Coefficients of the Adams-Bashforth formulas in backward differences,
+# sum_j gamma[j]/(m+1-j) = 1, and of the error of the Adams-Moulton
+# formulas, gamma_star[j] = gamma[j] - gamma[j-1] (Hairer, Norsett and
+# Wanner, III.1).
+gamma = ones(MAX_ORDER + 2)
+for m in range(1, MAX_ORDER + 2):
+    gamma[m] = 1 - (gamma[:m] / arange(m + 1., 1., -1)).sum()
+gamma_star = gamma - ones(MAX_ORDER + 2)
+gamma_star[1:] = gamma[1:] - gamma[:-1]
+
+# Coefficients in s of the integrals from 0 to s of the polynomials
+# binom(u+j-1,j) of the backward difference interpolant
+# f(t + u*h) = sum_j binom(u+j-1,j) del^j f(t), for the dense output.
+def _integrals():
+    P = zeros((MAX_ORDER + 2, MAX_ORDER + 3))
+    p = zeros(MAX_ORDER + 2)
+    p[0] = 1.
+    for j in range(MAX_ORDER + 2):
+        P[j,1:] = p / arange(1., MAX_ORDER + 3)
+        # p <- p * (u + j) / (j + 1)
+        p[1:] = (p[:-1] + j * p[1:]) / (j + 1.)
+        p[0]  = j * p[0] / (j + 1.)
+    return P
+integrals = _integrals()
+
+
+class Adams(Integrator):
+    """
+    Variable order (1 to 12), quasi-constant step size Adams-Bashforth-
+    Moulton method in PECE form for non-stiff problems with an expensive
+    right-hand side: a step costs two evaluations of f, whatever the
+    order.  The derivatives at the past steps are kept as a table of
+    backward differences, updated in place and rescaled when the step size
+    changes as in BDF.  The error of the order k predictor is estimated
+    from the corrector, which is used to advance (local extrapolation), and
+    the order and step size are chosen from the estimates at the
+    neighbouring orders.  The first START_ORDER points come from RungeKutta
+    steps.
+
+    The state of the method is kept between runs, so integrating once per
+    output interval continues with the same order, step size and history.
+    The work of every run is accumulated in stats, see Stats.  If given,
+    callback(t,y) is called after every accepted step.  Complex states are
+    integrated as such, see Integrator.state_type().
+    """
+    runner = True
+
+    def __init__(self,dt=None,atol=1e-6,rtol=1e-3,hmax=inf,
+                 max_order=MAX_ORDER,profile=False,callback=None):
+        self.dt   = dt
+        self.atol = atol
+        self.rtol = rtol
+        self.hmax = hmax
+        self.max_order = min(max_order, MAX_ORDER)
+        self.last = None
+        self.stats    = Stats(profile)
+        self.callback = callback
+
+    def reset(self,n,has_jac):
+        self.last = None
+        self.stats.reset()
+
+    def initial_step(self,f,t0,y0,f0,f_params):
+        # as BDF.initial_step(), for a method of order START_ORDER.
+        scale = self.atol + self.rtol * abs(y0)
+        d0 = rms(y0 / scale)
+        d1 = rms(f0 / scale)
+        if d0 < 1e-5 or d1 < 1e-5:
+            h0 = 1e-6
+        else:
+            h0 = 0.01 * d0 / d1
+        f1 = f(t0 + h0, y0 + h0 * f0, *f_params)
+        d2 = rms((f1 - f0) / scale) / h0
+        if d1 <= 1e-15 and d2 <= 1e-15:
+            h1 = max(1e-6, h0 * 1e-3)
+        else:
+            h1 = (0.01 / max(d1, d2)) ** (1. / (START_ORDER + 1))
+        return min(100 * h0, h1, self.hmax)
+
+    def step_size(self,f,t,y,f_params):
+        if self.last is not None and self.last[0] == t:
+            return self.last[4]
+        if self.dt is not None:
+            return self.dt
+        y  = self.as_state(y)
+        f0 = asarray(f(t,y,*f_params), dtype=y.dtype)
+        return self.initial_step(f,t,y,f0,f_params)
+
+    def start(self,f,t0,y0,t1,f_params):
+        # takes START_ORDER - 1 RungeKutta steps from y0 and returns the
+        # state, the backward differences of f and the order and step size
+        # to continue with.
+        f0 = f(t0,y0,*f_params)
+        h  = self.dt if self.dt is not None else \
+             self.initial_step(f,t0,y0,f0,f_params)
+        k  = min(START_ORDER, self.max_order)
+        h  = min(h, (t1 - t0) / float(k))
+        rk = RungeKutta(h)
+
+        D  = zeros((MAX_ORDER + 3,) + y0.shape, dtype=y0.dtype)
+        D[0] = f0
+        t, y = t0, y0
+        for i in range(1, k):
+            y = rk.step(f,t,y,D[0],h,f_params)
+            t = t0 + i * h
+            self.stats.accept(h)
+            if self.callback is not None:
+                self.callback(t,y.reshape(self.shape))
+            d = f(t,y,*f_params) - D[:i].sum(axis=0)
+            D[i] = d
+            for j in reversed(range(i)):
+                D[j] += D[j + 1]
+        return t, y, D, k, h
+
+    def run(self,f,jac,y0,t0,t1,f_params,jac_params):
+        return self.march(f,y0,t0,t1,f_params)
+
+    def run_dense(self,f,jac,y0,t0,t_eval,f_params,jac_params,out=None):
+        # integrate from t=t0 to the last of the increasing times t_eval in a
+        # single pass, filling out[i] with the solution at t_eval[i] from
+        # the Adams polynomial of each accepted step.
+        t_eval = asarray(t_eval, dtype=float)
+        yo     = self.as_state(y0)
+        if out is None:
+            out = empty((len(t_eval),) + yo.shape, dtype=yo.dtype)
+        j = [searchsorted(t_eval, t0, 'right')]
+        out[:j[0]] = yo
+
+        outm = out.reshape(len(t_eval), -1)
+
+        def accepted(t, h, y, D, order):
+            k = searchsorted(t_eval, t, 'right')
+            if k > j[0]:
+                s = (t_eval[j[0]:k] - t) / h
+                I = dot_powers(s, integrals[:order + 1])
+                outm[j[0]:k] = y + h * tensordot(I, D[:order + 1], 1)
+                j[0] = k
+
+        y, t = self.march(f,y0,t0,t_eval[-1],f_params,accepted)
+        out[j[0]:] = y
+        return out
+
+    def march(self,f,y0,t0,t1,f_params,accepted=None):
+        # If given, accepted(t,h,y,D,order) is called after every step of
+        # size h to t with the updated differences D.
+        # States of any shape are integrated flattened, as change_D()
+        # needs the differences as a matrix.
+        st = self.stats
+        st.start()
+        fs = st.rhs(f)
+        yo = self.as_state(y0)
+        shape = self.shape = yo.shape
+        if yo.ndim == 1:
+            f = fs
+        else:
+            f  = lambda t,y,*p: asarray(fs(t,y.reshape(shape),*p)).ravel()
+            yo = yo.ravel()
+
+        if self.last is not None and self.last[0] == t0 \
+           and array_equal(self.last[1], yo):
+            # Continue from the previous run.
+            t, y, D, order, h, n_equal = self.last
+            y = y.copy()
+        elif t1 <= t0:
+            # Nothing to integrate; the start-up, whose step size is bounded
+            # by the length of the run, is left to the next run.
+            st.stop()
+            self.success = True
+            return yo.reshape(shape).copy(), t0
+        else:
+            t, y, D, order, h = self.start(f,t0,yo,t1,f_params)
+            n_equal = order - 1
+            if accepted is not None and t > t0:
+                accepted(t,h,y,D,order - 1)
+
+        while t < t1:
+            min_step = 10 * abs(nextafter(t, inf) - t)
+            if h > self.hmax:
+                change_D(D, order, self.hmax / h)
+                h = self.hmax
+                n_equal = 0
+
+            n_fail = 0
+            while True:
+                if h < min_step:
+                    st.stop()
+                    self.success = False
+                    return y.reshape(shape), t
+
+                t_new = t + h
+                if t_new > t1:
+                    # shorten the step to end at t1
+                    t_new = t1
+                    change_D(D, order, (t1 - t) / h)
+                    n_equal = 0
+                h = t_new - t
+
+                # predict with Adams-Bashforth, correct with Adams-Moulton
+                p  = y + h * tensordot(gamma[:order], D[:order], 1)
+                fp = f(t_new,p,*f_params)
+                dp = fp - D[:order].sum(axis=0)
+                y_new = p + h * gamma[order] * dp
+
+                scale = self.atol + self.rtol * maximum(abs(y), abs(y_new))
+                error_norm = h * abs(gamma_star[order]) * rms(dp / scale)
+                if error_norm <= 1:
+                    break
+                st.nreject += 1
+                n_fail  += 1
+                n_equal  = 0
+                if n_fail == 1:
+                    factor = max(MIN_FACTOR,
+                                 0.9 * error_norm ** (-1. / (order + 1)))
+                else:
+                    # Repeated failures mean the high differences are
+                    # unreliable: halve the step and drop the order, to 1
+                    # after the third failure (Shampine and Gordon).
+                    factor = 0.5
+                    order  = max(1, order - 1) if n_fail == 2 else 1
+                h *= factor
+                change_D(D, order, factor)
+
+            n_equal += 1
+            t = t_new
+            y = y_new
+
+            # Update the differences with the derivative at the new point
+            d = f(t,y,*f_params) - D[:order + 1].sum(axis=0)
+            D[order + 2] = d - D[order + 1]
+            D[order + 1] = d
+            for i in reversed(range(order + 1)):
+                D[i] += D[i + 1]
+
+            st.accept(h)
+            if accepted is not None:
+                accepted(t,h,y,D,order)
+            if self.callback is not None:
+                self.callback(t,y.reshape(shape))
+
+            if n_equal < order + 1:
+                continue
+
+            # Choose the order and step size from the error estimates of
+            # the neighbouring orders.
+            if order > 1:
+                error_m_norm = h * abs(gamma_star[order - 1]) \
+                                 * rms(D[order - 1] / scale)
+            else:
+                error_m_norm = inf
+            if order < self.max_order:
+                error_p_norm = h * abs(gamma_star[order + 1]) \
+                                 * rms(D[order + 1] / scale)
+            else:
+                error_p_norm = inf
+
+            error_norms = array([error_m_norm, error_norm, error_p_norm])
+            with errstate(divide='ignore'):
+                factors = error_norms ** (-1. / arange(order, order + 3))
+
+            order += argmax(factors) - 1
+            factor = min(MAX_FACTOR, 0.9 * factors.max())
+            h *= factor
+            change_D(D, order, factor)
+            n_equal = 0
+
+        self.last = (t, y.copy(), D, order, h, n_equal)
+        st.stop()
+        if isfinite(y).all(): self.success = True
+        return y.reshape(shape), t
+
+def dot_powers(s, P):
+    # values at the points s of the polynomials with coefficients P[j] in
+    # increasing powers.
+    return (asarray(s)[:,newaxis] ** arange(P.shape[1])).dot(P.T)
+
+if Adams.runner:
+    register(Adams)
@@ -0,0 +1,383 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import Integrator, register, rms
+from scipy.linalg import lu_factor, lu_solve
+from scipy.linalg.lapack import dgbtrf, dgbtrs
+from scipy.sparse import csc_matrix, identity, block_diag
+from scipy.sparse.linalg import splu
+from ode_solvers.Jacobian import band_pattern, group_columns, fd_jacobian, \
+                                 from_banded, to_banded
+from ode_solvers.Stats import Stats
+from numpy import array, asarray, zeros, empty, eye, arange, hstack, \
+                  cumsum, cumprod, dot, sqrt, maximum, isfinite, \
+                  array_equal, argmax, finfo, nextafter, errstate, inf, \
+                  newaxis, ones
+
+MAX_ORDER      = 5
+NEWTON_MAXITER = 4
+MIN_FACTOR     = 0.2
+MAX_FACTOR     = 10.
+
+# Coefficients of the numerical differentiation formulas (Shampine and
+# Reichelt, 'The MATLAB ODE Suite', 1997).
+kappa       = array([0., -0.1850, -1./9, -0.0823, -0.0415, 0.])
+gamma       = hstack((0., cumsum(1. / arange(1, MAX_ORDER + 1))))
+alpha       = (1 - kappa) * gamma
+error_const = kappa * gamma + 1. / arange(1, MAX_ORDER + 2)
+
+def compute_R(order, factor):
+    # matrix changing the backward differences for a step size multiplied
+    # by factor.
+    I = arange(1., order + 1)[:,newaxis]
+    J = arange(1., order + 1)
+    M = zeros((order + 1, order + 1))
+    M[1:,1:] = (I - 1 - factor * J) / I
+    M[0] = 1
+    return cumprod(M, axis=0)
+
+def change_D(D, order, factor):
+    RU = dot(compute_R(order, factor), compute_R(order, 1))
+    D[:order + 1] = dot(RU.T, D[:order + 1])
+
+
+class BDF(Integrator):
+    """
+    Variable order (1 to 5), quasi-constant step size backward
+    differentiation formulas for stiff problems.  The Newton iterations use
+    the Jacobian jac if one is supplied to the ode, and forward differences
+    otherwise.  The Jacobian is only recomputed when the iterations fail to
+    converge, and its LU factorization is reused for as long as the step
+    size does not change.
+
+    The state of the method is kept between runs, so integrating once per
+    output interval continues with the same order, step size and Jacobian.
+
+    For large systems, either lband and uband give the number of nonzero
+    diagonals below and above the main diagonal of a banded Jacobian, or
+    jac_sparsity gives its sparsity pattern.  A user Jacobian then returns
+    the banded storage jac[uband + i - j, j] = dfdy[i,j] as for scipy's
+    vode, or a sparse matrix, respectively.  Finite difference Jacobians
+    difference groups of structurally independent columns together, and
+    the iteration matrix is factored with LAPACK's banded LU or SuperLU,
+    so the cost scales with the bandwidth or number of nonzeros instead of
+    the size of the system.
+
+    An ensemble of m states of size n is integrated as a single system of
+    size m*n, whose Jacobian is block diagonal: it is differenced and
+    factored as a sparse one, the blocks of the given sparsity pattern, or
+    dense ones, along the diagonal.  A user Jacobian is then called with
+    the ensemble and returns that of the whole system.
+
+    The work of every run is accumulated in stats, see Stats; steps whose
+    Newton iterations fail count as rejected.  If given, callback(t,y) is
+    called after every accepted step.  The states are real.
+    """
+    runner = True
+    dtype  = float
+
+    def __init__(self,dt=None,atol=1e-6,rtol=1e-3,hmax=inf,
+                 lband=None,uband=None,jac_sparsity=None,profile=False,
+                 callback=None):
+        self.dt   = dt
+        self.atol = atol
+        self.rtol = rtol
+        self.hmax = hmax
+        self.lband = lband
+        self.uband = uband
+        self.jac_sparsity = jac_sparsity
+        self.has_jac = False
+        self.last = None
+        self.stats    = Stats(profile)
+        self.callback = callback
+
+    def reset(self,n,has_jac):
+        self.has_jac = has_jac
+        self.last = None
+        self.stats.reset()
+        self.structure(n, 1)
+
+    def structure(self,n,m):
+        # the sparsity pattern of the Jacobian of m states of size n,
+        # integrated as one system, and its groups of columns.
+        self.size    = (n, m)
+        self.banded  = self.lband is not None or self.uband is not None
+        self.pattern = None
+        if self.banded:
+            # the blocks of the members fall within the band
+            self.lband   = self.lband or 0
+            self.uband   = self.uband or 0
+            self.pattern = band_pattern(n*m, self.lband, self.uband)
+            self.groups  = arange(n*m) % (self.lband + self.uband + 1)
+            return
+        if self.jac_sparsity is not None:
+            self.pattern = csc_matrix(self.jac_sparsity)
+        elif m > 1:
+            self.pattern = csc_matrix(ones((n, n)))
+        if self.pattern is not None:
+            if m > 1:
+                self.pattern = block_diag([self.pattern]*m, format='csc')
+            self.groups  = group_columns(self.pattern)
+
+    def jacobian(self,f,jac,t,y,f_params,jac_params):
+        self.stats.njev += 1
+        if self.has_jac:
+            J = jac(t,y,*jac_params)
+            if self.banded:
+                return from_banded(asarray(J, dtype=float),
+                                   self.lband, self.uband)
+            if self.pattern is not None:
+                return csc_matrix(J, dtype=float)
+            return asarray(J, dtype=float)
+        # forward differences
+        fy = f(t,y,*f_params)
+        if self.pattern is not None:
+            return fd_jacobian(f,t,y,fy,f_params,self.pattern,self.groups)
+        h  = sqrt(finfo(float).eps) * maximum(1., abs(y))
+        J  = empty((y.size, y.size))
+        for j in range(y.size):
+            yj     = y.copy()
+            yj[j] += h[j]
+            J[:,j] = (f(t,yj,*f_params) - fy) / h[j]
+        return J
+
+    def initial_step(self,f,t0,y0,f0,f_params):
+        # step size such that the first order local error is about the
+        # tolerance (Hairer, Norsett and Wanner, II.4).
+        scale = self.atol + self.rtol * abs(y0)
+        d0 = rms(y0 / scale)
+        d1 = rms(f0 / scale)
+        if d0 < 1e-5 or d1 < 1e-5:
+            h0 = 1e-6
+        else:
+            h0 = 0.01 * d0 / d1
+        f1 = f(t0 + h0, y0 + h0 * f0, *f_params)
+        d2 = rms((f1 - f0) / scale) / h0
+        if d1 <= 1e-15 and d2 <= 1e-15:
+            h1 = max(1e-6, h0 * 1e-3)
+        else:
+            h1 = (0.01 / max(d1, d2)) ** .5
+        return min(100 * h0, h1, self.hmax)
+
+    def step_size(self,f,t,y,f_params):
+        if self.last is not None and self.last[0] == t:
+            return self.last[4]
+        if self.dt is not None:
+            return self.dt
+        f0 = asarray(f(t,y,*f_params), dtype=float)
+        return self.initial_step(f,t,asarray(y, dtype=float),f0,f_params)
+
+    def factor(self,c,J):
+        # factorization of the iteration matrix I - c*J.
+        n = J.shape[0]
+        if self.banded:
+            ab = to_banded(identity(n) - c * J, self.lband, self.uband,
+                           self.lband)
+            lu, ipiv, info = dgbtrf(ab, self.lband, self.uband)
+            # None for a singular matrix
+            return (lu, ipiv) if info == 0 else None
+        if self.pattern is not None:
+            return splu(csc_matrix(identity(n) - c * J))
+        return lu_factor(eye(n) - c * J, check_finite=False)
+
+    def solve(self,LU,b):
+        if self.banded:
+            x, info = dgbtrs(LU[0], self.lband, self.uband, b, LU[1])
+            return x if info == 0 else None
+        if self.pattern is not None:
+            return LU.solve(b)
+        return lu_solve(LU, b, check_finite=False)
+
+    def newton(self,f,t,y_predict,c,psi,LU,scale,tol,f_params):
+        # solves the BDF system by simplified Newton iterations with the
+        # factorization LU of I - c*J.
+        d = 0
+        y = y_predict.copy()
+        dy_norm_old = None
+        converged = False
+        for k in range(NEWTON_MAXITER):
+            fy = f(t,y,*f_params)
+            if not isfinite(fy).all():
+                break
+            dy = self.solve(LU, c * fy - psi - d)
+            if dy is None:
+                break
+            dy_norm = rms(dy / scale)
+            rate = None if dy_norm_old is None else dy_norm / dy_norm_old
+            if rate is not None and (rate >= 1 or \
+               rate ** (NEWTON_MAXITER - k) / (1 - rate) * dy_norm > tol):
+                break
+            y += dy
+            d += dy
+            if dy_norm == 0 or \
+               (rate is not None and rate / (1 - rate) * dy_norm < tol):
+                converged = True
+                break
+            dy_norm_old = dy_norm
+        return converged, k + 1, y, d
+
+    def run(self,f,jac,y0,t0,t1,f_params,jac_params):
+        st = self.stats
+        st.start()
+        f  = st.rhs(f)
+        yo = self.as_state(y0)
+        shape = yo.shape
+        if yo.ndim > 1:
+            # an ensemble, integrated flattened
+            fs, js = f, jac
+            f   = lambda t,y,*p: asarray(fs(t,y.reshape(shape),*p)).ravel()
+            jac = lambda t,y,*p: js(t,y.reshape(shape),*p)
+            yo  = yo.ravel()
+            if self.size != (shape[-1], yo.size // shape[-1]):
+                self.structure(shape[-1], yo.size // shape[-1])
+        n  = yo.size
+
+        if self.last is not None and self.last[0] == t0 \
+           and array_equal(self.last[1], yo):
+            # Continue from the previous run.
+            D, order, h, n_equal, J, LU = self.last[2:]
+        else:
+            f0 = asarray(f(t0,yo,*f_params), dtype=float)
+            h  = self.dt if self.dt is not None else \
+                 self.initial_step(f,t0,yo,f0,f_params)
+            D  = zeros((MAX_ORDER + 3, n))
+            D[0] = yo
+            D[1] = f0 * h
+            order   = 1
+            n_equal = 0
+            J  = self.jacobian(f,jac,t0,yo,f_params,jac_params)
+            LU = None
+
+        newton_tol = max(10 * finfo(float).eps / self.rtol,
+                         min(0.03, self.rtol ** 0.5))
+        t  = t0
+        while t < t1:
+            min_step = 10 * abs(nextafter(t, inf) - t)
+            if h > self.hmax:
+                change_D(D, order, self.hmax / h)
+                h = self.hmax
+                n_equal = 0
+                LU = None
+            current_jac = False
+
+            accepted = False
+            while not accepted:
+                if h < min_step:
+                    st.stop()
+                    self.success = False
+                    return D[0].reshape(shape), t
+
+                t_new = t + h
+                if t_new > t1:
+                    # shorten the step to end at t1
+                    t_new = t1
+                    change_D(D, order, (t1 - t) / h)
+                    n_equal = 0
+                    LU = None
+                h = t_new - t
+
+                y_predict = D[:order + 1].sum(axis=0)
+                scale = self.atol + self.rtol * abs(y_predict)
+                psi = dot(D[1:order + 1].T, gamma[1:order + 1]) / alpha[order]
+                c   = h / alpha[order]
+
+                converged = False
+                while not converged:
+                    if LU is None:
+                        LU = self.factor(c, J)
+                    if LU is not None:
+                        converged, n_iter, y_new, d = \
+                          self.newton(f,t_new,y_predict,c,psi,LU,scale,
+                                      newton_tol,f_params)
+                    if not converged:
+                        if current_jac:
+                            break
+                        J  = self.jacobian(f,jac,t_new,y_predict,
+                                           f_params,jac_params)
+                        LU = None
+                        current_jac = True
+
+                if not converged:
+                    st.nreject += 1
+                    h *= 0.5
+                    change_D(D, order, 0.5)
+                    n_equal = 0
+                    LU = None
+                    continue
+
+                safety = 0.9 * (2 * NEWTON_MAXITER + 1) \
+                             / (2 * NEWTON_MAXITER + n_iter)
+                scale = self.atol + self.rtol * abs(y_new)
+                error_norm = rms(error_const[order] * d / scale)
+
+                if error_norm > 1:
+                    st.nreject += 1
+                    factor = max(MIN_FACTOR,
+                                 safety * error_norm ** (-1. / (order + 1)))
+                    h *= factor
+                    change_D(D, order, factor)
+                    n_equal = 0
+                    # the iterations converged, so the Jacobian is kept
+                else:
+                    accepted = True
+
+            n_equal += 1
+            t = t_new
+
+            # Update the differences
+            D[order + 2] = d - D[order + 1]
+            D[order + 1] = d
+            for i in reversed(range(order + 1)):
+                D[i] += D[i + 1]
+
+            st.accept(h)
+            if self.callback is not None:
+                self.callback(t, D[0].reshape(shape))
+
+            if n_equal < order + 1:
+                continue
+
+            # Choose the order and step size from the error estimates of
+            # the neighbouring orders.
+            if order > 1:
+                error_m_norm = rms(error_const[order - 1] * D[order] / scale)
+            else:
+                error_m_norm = inf
+            if order < MAX_ORDER:
+                error_p_norm = rms(error_const[order + 1] * D[order + 2]
+                                   / scale)
+            else:
+                error_p_norm = inf
+
+            error_norms = array([error_m_norm, error_norm, error_p_norm])
+            with errstate(divide='ignore'):
+                factors = error_norms ** (-1. / arange(order, order + 3))
+
+            order += argmax(factors) - 1
+            factor = min(MAX_FACTOR, safety * factors.max())
+            h *= factor
+            change_D(D, order, factor)
+            n_equal = 0
+            LU = None
+
+        yn = D[0].copy()
+        self.last = (t, yn, D, order, h, n_equal, J, LU)
+        st.stop()
+        if isfinite(yn).all(): self.success = True
+        return yn.reshape(shape), t
+
+if BDF.runner:
+    register(BDF)
@@ -0,0 +1,267 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import register, Integrator, rms
+from ode_solvers.Stats import Stats
+from numpy import asarray, zeros, arange, cumsum, maximum, \
+                  isfinite, array_equal, nextafter, log10, inf
+
+MAX_ORDER  = 18
+MIN_FACTOR = 0.02
+REDUCTION  = 4.
+
+# Numbers of midpoint substeps of the rows of the extrapolation tableau,
+# the harmonic sequence of Deuflhard, the work of a step with rows 0 to j,
+# counting the evaluation of f at the start of the step once, and the
+# Aitken-Neville coefficients 1/((n[j]/n[j-l])**2 - 1) of the tableau.
+substeps = 2 * arange(1, MAX_ORDER // 2 + 1)
+work     = 1 + cumsum(substeps - 1)
+coefficients = zeros((len(substeps), len(substeps)))
+for j in range(len(substeps)):
+    for l in range(1, j + 1):
+        coefficients[j,l] = 1. / ((substeps[j] / float(substeps[j-l]))**2 - 1)
+
+
+def midpoint(f,t,y,f0,H,n,f_params):
+    # Gragg's modified midpoint rule over H in n substeps, given f0 = f(t,y).
+    # For even n the error of the result has an expansion in even powers of
+    # H/n, which the extrapolation removes.
+    h  = H / n
+    zo = y
+    z  = y + h * f0
+    for m in range(1, n):
+        zo, z = z, zo + 2 * h * f(t + m * h, z, *f_params)
+    return z
+
+
+class BulirschStoer(Integrator):
+    """
+    Gragg-Bulirsch-Stoer extrapolation method for smooth non-stiff problems
+    at tight tolerances, with variable order (4 to max_order) and step size.
+    A step of size H integrates with the modified midpoint rule, the
+    repeated EulerRichardson step, in n = 2, 4, 6, ... substeps, and
+    extrapolates the results to n infinite by polynomials in (H/n)**2; row
+    j of the tableau has order 2j+2 and the difference with row j-1
+    estimates its error.  The step is accepted at the first row around the
+    current one within the tolerance, and the order and step size are then
+    chosen to minimise the work per unit step (Hairer, Norsett and Wanner,
+    II.9), which lets the method take very large steps.
+
+    The midpoint sequences of the rows are independent of one another.
+    With threads set, they are computed concurrently by a pool of that many
+    threads, all the rows the step may need at once, which shortens the
+    wall time of a step when f releases the GIL (large numpy operations,
+    compiled code) at the cost of some evaluations the serial method would
+    have saved; f must then be thread safe, and its time is not profiled.
+    The pool lives for the duration of a run only, and is not pickled.
+
+    The order and step size are kept between runs, so integrating once per
+    output interval continues with them.  The work of every run is
+    accumulated in stats, see Stats.  If given, callback(t,y) is called
+    after every accepted step.  Complex states are integrated as such, see
+    Integrator.state_type().
+    """
+    runner = True
+
+    def __init__(self,dt=None,atol=1e-12,rtol=1e-10,hmax=inf,
+                 max_order=MAX_ORDER,threads=None,profile=False,
+                 callback=None):
+        self.dt   = dt
+        self.atol = atol
+        self.rtol = rtol
+        self.hmax = hmax
+        self.max_row  = max(2, min(max_order, MAX_ORDER) // 2 - 1)
+        self.threads  = threads
+        self.pool     = None   # the thread pool of the run in progress
+        self.last     = None
+        self.stats    = Stats(profile)
+        self.callback = callback
+
+    def reset(self,n,has_jac):
+        self.last = None
+        self.stats.reset()
+
+    def initial_row(self):
+        # row of the order suited to the tolerance, as in ODEX
+        row = int(-log10(max(self.rtol, 1e-40)) * 0.6 + 0.5)
+        return min(max(row, 1), self.max_row - 1)
+
+    def initial_step(self,f,t0,y0,f0,f_params,row):
+        # as Adams.initial_step(), for a method of order 2*row + 2.
+        scale = self.atol + self.rtol * abs(y0)
+        d0 = rms(y0 / scale)
+        d1 = rms(f0 / scale)
+        if d0 < 1e-5 or d1 < 1e-5:
+            h0 = 1e-6
+        else:
+            h0 = 0.01 * d0 / d1
+        f1 = f(t0 + h0, y0 + h0 * f0, *f_params)
+        d2 = rms((f1 - f0) / scale) / h0
+        if d1 <= 1e-15 and d2 <= 1e-15:
+            h1 = max(1e-6, h0 * 1e-3)
+        else:
+            h1 = (0.01 / max(d1, d2)) ** (1. / (2 * row + 3))
+        return min(100 * h0, h1, self.hmax)
+
+    def step_size(self,f,t,y,f_params):
+        if self.last is not None and self.last[0] == t:
+            return self.last[2]
+        if self.dt is not None:
+            return self.dt
+        y  = self.as_state(y)
+        f0 = asarray(f(t,y,*f_params), dtype=y.dtype)
+        return self.initial_step(f,t,y,f0,f_params,self.initial_row())
+
+    def __getstate__(self):
+        # the threads of a pool cannot be pickled; a run starts its own
+        state = self.__dict__.copy()
+        state['pool'] = None
+        return state
+
+    def run(self,f,jac,y0,t0,t1,f_params,jac_params):
+        try:
+            return self.march(f,y0,t0,t1,f_params)
+        finally:
+            if self.pool is not None:
+                # the workers exit once idle; joining them would wait for
+                # the pool's handler to poll, up to 0.1 s on Python 2
+                self.pool.close()
+                self.pool = None
+
+    def rows(self,f,t,y,f0,H,rows,f_params):
+        # returns the midpoint results of the given rows of the tableau for
+        # the step H, computed by the thread pool, largest first.
+        if self.pool is None:
+            from multiprocessing.pool import ThreadPool
+            self.pool = ThreadPool(self.threads)
+        results = dict((j, self.pool.apply_async(midpoint,
+                               (f,t,y,f0,H,substeps[j],f_params)))
+                       for j in reversed(rows))
+        return [results[j].get() for j in rows]
+
+    def march(self,f,y0,t0,t1,f_params):
+        st = self.stats
+        st.start()
+        fs = st.rhs(f)
+        y  = self.as_state(y0)
+        t  = t0
+        threaded = self.threads is not None and self.threads > 1
+
+        if self.last is not None and self.last[0] == t0 \
+           and array_equal(self.last[1], y):
+            # Continue from the previous run.
+            H, row = self.last[2:]
+        else:
+            row = self.initial_row()
+            H   = self.dt if self.dt is not None else \
+                  self.initial_step(fs,t0,y,fs(t0,y,*f_params),f_params,row)
+        H = min(H, self.hmax)
+        reject = False
+        f0     = None
+
+        while t < t1:
+            min_step = 10 * abs(nextafter(t, inf) - t)
+            if H < min_step:
+                self.last = None
+                st.stop()
+                self.success = False
+                return y, t
+            Hnext = H
+            if t + H > t1:
+                # shorten the step to end at t1
+                H = t1 - t
+
+            if f0 is None:
+                f0 = fs(t,y,*f_params)
+            last = min(row + 1, self.max_row)
+            if threaded:
+                M = self.rows(f,t,y,f0,H,range(last + 1),f_params)
+                st.nfev += int(work[last]) - 1
+
+            # Build the tableau row by row, testing convergence from the
+            # row before the current one on; a row far from convergence
+            # rejects the step early.
+            factors = zeros(last + 1)
+            accept  = None
+            for j in range(last + 1):
+                Tj = [M[j] if threaded else
+                      midpoint(fs,t,y,f0,H,substeps[j],f_params)]
+                for l in range(1, j + 1):
+                    Tj.append(Tj[l-1] + (Tj[l-1] - T[l-1]) * coefficients[j,l])
+                T = Tj
+                if j == 0:
+                    continue
+                scale = self.atol + self.rtol * maximum(abs(y), abs(T[j]))
+                err   = rms((T[j] - T[j-1]) / scale)
+                expo  = 1. / (2 * j + 1)
+                # new step size over H, between MIN_FACTOR**expo/REDUCTION
+                # and 1/MIN_FACTOR**expo as in ODEX
+                fmin = MIN_FACTOR ** expo
+                if isfinite(err):
+                    factors[j] = min(1. / fmin, max(fmin / REDUCTION,
+                                     0.94 * (0.65 / max(err, 1e-300))**expo))
+                else:
+                    factors[j] = fmin / REDUCTION
+                if j < row - 1:
+                    continue
+                if err <= 1:
+                    accept = j
+                    break
+                # give up when the rows left cannot bring the error down,
+                # as it decreases by about (n[0]/n[i])**2 from row i-1 to i
+                if err * ((substeps[0] / substeps[j+1:last+1].astype(float))
+                          **2).prod() > 1:
+                    break
+
+            if accept is None:
+                st.nreject += 1
+                row = max(1, min(j, row))
+                H  *= factors[row]
+                reject = True
+                continue
+
+            t  = t + H
+            y  = T[accept]
+            f0 = None
+            st.accept(H)
+            if self.callback is not None:
+                self.callback(t,y)
+
+            # Choose the row and step size of the next step by the work
+            # per unit step of the rows around the one accepted.
+            j = accept
+            cost = work[:j + 1] / maximum(factors[:j + 1], 1e-300)
+            if j > 1 and cost[j-1] < 0.8 * cost[j]:
+                row, factor = j - 1, factors[j-1]
+            elif not reject and j < self.max_row and \
+                 (j == 1 or cost[j] < 0.9 * cost[j-1]):
+                row, factor = j + 1, factors[j] * work[j+1] / work[j]
+            else:
+                row, factor = j, factors[j]
+            if reject:
+                factor = min(factor, 1.)
+            reject = False
+            # a step shortened to end at t1 is not followed by a larger one
+            # than the step it replaced
+            H = min(H * factor, Hnext if H < Hnext else inf, self.hmax)
+
+        self.last = (t, y.copy(), H, row)
+        st.stop()
+        if isfinite(y).all(): self.success = True
+        return y, t
+
+if BulirschStoer.runner:
+    register(BulirschStoer)
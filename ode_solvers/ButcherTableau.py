@@ -0,0 +1,250 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from numpy import array, zeros, vstack
+
+class ButcherTableau(object):
+    """
+    Coefficients of an explicit Runge-Kutta method of order order: the stage
+    matrix a, the weights b and nodes c, optionally with the weights bstar
+    of an embedded solution of order error_order and the dense output
+    matrix P.  The solution at t + theta*dt is
+
+      y + dt * dot(dot(P, [theta, theta**2, ...]), k).
+
+    The error estimate of a step is dt * dot(e, k), with e = b - bstar
+    unless given; with e3 as well, the two estimates are combined as in
+    DOP853.  a, c and P may have rows past the stages of a step, for the
+    extra stages the dense output needs.  The arrays are made read-only so
+    a single instance can be shared by every integrator.
+    """
+
+    def __init__(self,a,b,c,bstar=None,P=None,order=None,error_order=None,
+                 e=None,e3=None):
+        self.a     = self._freeze(a)
+        self.b     = self._freeze(b)
+        self.c     = self._freeze(c)
+        self.bstar = self._freeze(bstar)
+        self.P     = self._freeze(P)
+        if e is None and bstar is not None:
+            e = self.b - self.bstar
+        self.e     = self._freeze(e)
+        self.e3    = self._freeze(e3)
+        self.order = order
+        self.error_order = error_order
+        self.stages = len(self.b)
+
+    @staticmethod
+    def _freeze(x):
+        if x is None:
+            return None
+        x = array(x, dtype=float)
+        x.setflags(write=False)
+        return x
+
+def nested(F):
+    # dense output matrix P of an interpolant given in the nested form of
+    # DOP853, y + theta*(F0 + (1-theta)*(F1 + theta*(F2 + ...))), where the
+    # terms are F[i] = dt * dot(W[i], k).
+    Q = zeros((1, F.shape[1]))        # coefficients of 1, theta, ...
+    for i, w in enumerate(F[::-1]):
+        Q[0] += w
+        xQ = vstack((zeros((1, F.shape[1])), Q))
+        Q  = xQ if i % 2 == 0 else vstack((Q, zeros((1, F.shape[1])))) - xQ
+    return Q[1:].T
+
+
+# Dormand-Prince 5(4) pair with first-same-as-last stage.  The solution at
+# t + theta*dt is y + dt * dot(dot(P, [theta, theta**2, theta**3,
+# theta**4]), k).
+_a = zeros((7,7))
+_a[1,0] = 1./5
+_a[2,0:2] = [3./40,9./40]
+_a[3,0:3] = [44./45,-56./15,32./9]
+_a[4,0:4] = [19372./6561,-25360./2187,64448./6561,-212./729]
+_a[5,0:5] = [9017./3168,-355./33,46732./5247,49./176,-5103./18656]
+_a[6,0:6] = [35./384,0.,500./1113,125./192,-2187./6784,11./84]
+
+DormandPrince = ButcherTableau(
+  order = 5,
+  error_order = 4,
+  a     = _a,
+  b     = [35./384, 0., 500./1113, 125./192,-2187./6784,11./84,0.],
+  c     = [0.,1./5, 3./10, 4./5, 8./9, 1.,1.],
+  bstar = [5179./57600, 0.,7571./16695,393./640,-92097./339200,187./2100,
+           1./40],
+  P     = [[1., -8048581381./2820520608, 8663915743./2820520608,
+            -12715105075./11282082432],
+           [0., 0., 0., 0.],
+           [0., 131558114200./32700410799, -68118460800./10900136933,
+            87487479700./32700410799],
+           [0., -1754552775./470086768, 14199869525./1410260304,
+            -10690763975./1880347072],
+           [0., 127303824393./49829197408, -318862633887./49829197408,
+            701980252875./199316789632],
+           [0., -282668133./205662961, 2019193451./616988883,
+            -1453857185./822651844],
+           [0., 40617522./29380423, -110615467./29380423,
+            69997945./29380423]])
+del _a
+
+# Tsitouras 5(4) pair, Comput. Math. Appl. 62 (2011) 770, with first-same-as-
+# last stage and a fourth-order continuous extension.  Its error constants
+# are smaller than those of Dormand-Prince for the same number of stages.
+_a = zeros((7,7))
+_a[1,0] = 0.161
+_a[2,0:2] = [-0.008480655492356989, 0.335480655492357]
+_a[3,0:3] = [2.897153057105493, -6.359448489975075, 4.3622954328695815]
+_a[4,0:4] = [5.325864828439257, -11.748883564062828, 7.4955393428898365,
+             -0.09249506636175525]
+_a[5,0:5] = [5.86145544294642, -12.92096931784711, 8.159367898576159,
+             -0.071584973281401, -0.028269050394068383]
+_a[6,0:6] = [0.09646076681806523, 0.01, 0.4798896504144996,
+             1.379008574103742, -3.290069515436081, 2.324710524099774]
+
+Tsitouras = ButcherTableau(
+  order = 5,
+  error_order = 4,
+  a     = _a,
+  b     = list(_a[6,:6]) + [0.],
+  c     = [0., 0.161, 0.327, 0.9, 0.9800255409045097, 1., 1.],
+  e     = [-0.00178001105222577714, -0.0008164344596567469,
+           0.007880878010261995, -0.1447110071732629, 0.5823571654525552,
+           -0.45808210592918697, 1./66],
+  P     = [[1., -2.763706197274826, 2.9132554618219126, -1.0530884977290216],
+           [0., 0.13169999999999998, -0.2234, 0.1017],
+           [0., 3.9302962368947516, -5.941033872131505, 2.490627285651253],
+           [0., -12.411077166933676, 30.33818863028232, -16.548102889244902],
+           [0., 37.50931341651104, -88.1789048947664, 47.37952196281928],
+           [0., -27.896526289197286, 65.09189467479366, -34.87065786149661],
+           [0., 1.5, -4., 2.5]])
+del _a
+
+# Dormand-Prince 8(5,3) pair of Hairer's DOP853, with first-same-as-last
+# stage and three extra stages for its seventh-order continuous extension.
+# The error estimate combines the fifth- and third-order embedded ones.
+_a = zeros((16,16))
+_a[1,0] = 0.05260015195876773
+_a[2,[0,1]] = [0.0197250569845379, 0.0591751709536137]
+_a[3,[0,2]] = [0.02958758547680685, 0.08876275643042054]
+_a[4,[0,2,3]] = [0.2413651341592667, -0.8845494793282861, 0.924834003261792]
+_a[5,[0,3,4]] = [0.037037037037037035, 0.17082860872947386,
+                 0.12546768756682242]
+_a[6,[0,3,4,5]] = [0.037109375, 0.17025221101954405, 0.06021653898045596,
+                   -0.017578125]
+_a[7,[0,3,4,5,6]] = [0.03709200011850479, 0.17038392571223998,
+                     0.10726203044637328, -0.015319437748624402,
+                     0.008273789163814023]
+_a[8,[0,3,4,5,6,7]] = [0.6241109587160757, -3.3608926294469414,
+                       -0.868219346841726, 27.59209969944671,
+                       20.154067550477894, -43.48988418106996]
+_a[9,[0,3,4,5,6,7,8]] = [0.47766253643826434, -2.4881146199716677,
+                         -0.590290826836843, 21.230051448181193,
+                         15.279233632882423, -33.28821096898486,
+                         -0.020331201708508627]
+_a[10,[0,3,4,5,6,7,8,9]] = [-0.9371424300859873, 5.186372428844064,
+                            1.0914373489967295, -8.149787010746927,
+                            -18.52006565999696, 22.739487099350505,
+                            2.4936055526796523, -3.0467644718982196]
+_a[11,[0,3,4,5,6,7,8,9,10]] = [2.273310147516538, -10.53449546673725,
+                               -2.0008720582248625, -17.9589318631188,
+                               27.94888452941996, -2.8589982771350235,
+                               -8.87285693353063, 12.360567175794303,
+                               0.6433927460157636]
+_a[12,[0,5,6,7,8,9,10,11]] = [0.054293734116568765, 4.450312892752409,
+                              1.8915178993145003, -5.801203960010585,
+                              0.3111643669578199, -0.1521609496625161,
+                              0.20136540080403034, 0.04471061572777259]
+_a[13,[0,6,7,8,9,10,11,12]] = [0.056167502283047954, 0.25350021021662483,
+                               -0.2462390374708025, -0.12419142326381637,
+                               0.15329179827876568, 0.00820105229563469,
+                               0.007567897660545699, -0.008298]
+_a[14,[0,5,6,7,10,11,12,13]] = [0.03183464816350214, 0.028300909672366776,
+                                0.053541988307438566, -0.05492374857139099,
+                                -0.00010834732869724932, 0.0003825710908356584,
+                                -0.00034046500868740456, 0.1413124436746325]
+_a[15,[0,5,6,7,8,12,13,14]] = [-0.42889630158379194, -4.697621415361164,
+                               7.683421196062599, 4.06898981839711,
+                               0.3567271874552811, -0.0013990241651590145,
+                               2.9475147891527724, -9.15095847217987]
+_c = [0.0, 0.05260015195876773, 0.0789002279381516, 0.1183503419072274,
+      0.2816496580927726, 0.3333333333333333, 0.25, 0.3076923076923077,
+      0.6512820512820513, 0.6, 0.8571428571428571, 1.0, 1.0, 0.1, 0.2,
+      0.7777777777777778]
+_e5 = [0.01312004499419488, 0.0, 0.0, 0.0, 0.0, -1.2251564463762044,
+       -0.4957589496572502, 1.6643771824549864, -0.35032884874997366,
+       0.3341791187130175, 0.08192320648511571, -0.022355307863886294, 0.0]
+_e3 = [-0.18980075407240762, 0.0, 0.0, 0.0, 0.0, 4.450312892752409,
+       1.8915178993145003, -5.801203960010585, -0.4226823213237919,
+       -0.1521609496625161, 0.20136540080403034, 0.02265179219836082, 0.0]
+_d = zeros((4,16))
+_d[0,[0,5,6,7,8,9,10,11,12,13,14,15]] = [-8.428938276109013,
+                                         0.5667149535193777,
+                                         -3.0689499459498917, 2.38466765651207,
+                                         2.117034582445028, -0.871391583777973,
+                                         2.2404374302607883,
+                                         0.6315787787694688,
+                                         -0.08899033645133331,
+                                         18.148505520854727,
+                                         -9.194632392478356,
+                                         -4.436036387594894]
+_d[1,[0,5,6,7,8,9,10,11,12,13,14,15]] = [10.427508642579134,
+                                         242.28349177525817,
+                                         165.20045171727028,
+                                         -374.5467547226902,
+                                         -22.113666853125306,
+                                         7.733432668472264,
+                                         -30.674084731089398,
+                                         -9.332130526430229,
+                                         15.697238121770845,
+                                         -31.139403219565178,
+                                         -9.35292435884448, 35.81684148639408]
+_d[2,[0,5,6,7,8,9,10,11,12,13,14,15]] = [19.985053242002433,
+                                         -387.0373087493518,
+                                         -189.17813819516758,
+                                         527.8081592054236, -11.57390253995963,
+                                         6.8812326946963, -1.0006050966910838,
+                                         0.7777137798053443,
+                                         -2.778205752353508,
+                                         -60.19669523126412, 84.32040550667716,
+                                         11.99229113618279]
+_d[3,[0,5,6,7,8,9,10,11,12,13,14,15]] = [-25.69393346270375,
+                                         -154.18974869023643,
+                                         -231.5293791760455, 357.6391179106141,
+                                         93.40532418362432, -37.45832313645163,
+                                         104.0996495089623, 29.8402934266605,
+                                         -43.53345659001114, 96.32455395918828,
+                                         -39.17726167561544,
+                                         -149.72683625798564]
+
+_w = zeros((7,16))
+_w[0] = _a[12]                            # y1 - y0
+_w[1] = -_a[12]
+_w[1,0] += 1.
+_w[2] = 2*_a[12]
+_w[2,[0,12]] -= 1.
+_w[3:] = _d
+
+DOP853 = ButcherTableau(
+  order = 8,
+  error_order = 7,
+  a     = _a,
+  b     = _a[12,:13],
+  c     = _c,
+  e     = _e5,
+  e3    = _e3,
+  P     = nested(_w))
+del _a, _c, _e5, _e3, _d, _w
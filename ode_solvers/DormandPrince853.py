@@ -0,0 +1,32 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import register
+from ode_solvers.EmbeddedRungeKutta import EmbeddedRungeKutta
+from ode_solvers.ButcherTableau import DOP853
+
+class DormandPrince853(EmbeddedRungeKutta):
+    """
+    Eighth-order pair of Hairer's DOP853, see EmbeddedRungeKutta.  A step
+    costs twelve evaluations of f, against six for RungeKutta45, but at
+    tight tolerances it takes far fewer steps.  Dense output and events
+    cost three more evaluations per step.
+    """
+    runner  = True
+    tableau = DOP853
+
+if DormandPrince853.runner:
+    register(DormandPrince853)
@@ -0,0 +1,69 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import register
+from ode_solvers.Exponential import Exponential
+
+class ETDRK4(Exponential):
+    """
+    Fourth order exponential time differencing Runge-Kutta method of Cox
+    and Matthews (2002), with the stages
+
+      a = exp(h/2*A) y + h/2*phi_1(h/2*A) N(t,y)
+      b = exp(h/2*A) y + h/2*phi_1(h/2*A) N(t+h/2,a)
+      c = exp(h/2*A) a + h/2*phi_1(h/2*A) (2 N(t+h/2,b) - N(t,y))
+
+    combined by the weights phi_1 - 3 phi_2 + 4 phi_3, 2 phi_2 - 4 phi_3
+    (twice) and 4 phi_3 - phi_2 of h*A (Hochbruck and Ostermann, 2010).
+    Four evaluations of N per step.
+    """
+    runner = True
+    order  = 4
+    phis   = 3
+
+    def step(self,f,t,y,fy,dt,f_params):
+      h  = dt / 2.
+      if self.krylov:
+        a  = self.combine(h,y,[fy])
+        fa = f(t + h,a,*f_params)
+        b  = self.combine(h,y,[fa])
+        fb = f(t + h,b,*f_params)
+        c  = self.combine(h,a,[2*fb - fy])
+        fc = f(t + dt,c,*f_params)
+        # the weights in powers of dt for combine()
+        w2 = -3*fy + 2*(fa + fb) - fc
+        w3 = 4*(fy - fa - fb + fc)
+        return self.combine(dt,y,[fy,w2/dt,w3/dt**2])
+
+      E2, Q, E, B1, B2, B4 = self.coefficients(dt)
+      mv = self.matvec
+      Ey = mv(E2,y)
+      a  = Ey + mv(Q,fy)
+      fa = f(t + h,a,*f_params)
+      b  = Ey + mv(Q,fa)
+      fb = f(t + h,b,*f_params)
+      c  = mv(E2,a) + mv(Q,2*fb - fy)
+      fc = f(t + dt,c,*f_params)
+      return mv(E,y) + mv(B1,fy) + mv(B2,fa + fb) + mv(B4,fc)
+
+    def tabulate(self,dt):
+      E2, P1h = self.phi(dt / 2., 1)
+      E, P1, P2, P3 = self.phi(dt)
+      return (E2, dt/2. * P1h, E, dt * (P1 - 3*P2 + 4*P3),
+              dt * (2*P2 - 4*P3), dt * (4*P3 - P2))
+
+if ETDRK4.runner:
+    register(ETDRK4)
@@ -0,0 +1,452 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import Integrator
+from numpy import *
+from ode_solvers.jit import jit_rhs, jit_loop
+from ode_solvers.Stats import Stats
+from ode_solvers.events import Events
+
+class EmbeddedRungeKutta(Integrator):
+    """
+    Adaptive explicit Runge-Kutta integrator driven by the embedded pair of
+    its tableau, see ButcherTableau; the subclasses only choose one.  The
+    error of every step is estimated from the embedded solution and scaled
+    by atol + rtol*|y|, and the step size follows a PI controller: an
+    accepted step of error err, after one of error errold, is followed by
+    one S * err**-(1/q - .75*beta) * errold**beta times larger, with q one
+    more than the order of the error estimate, at most hmax and at least
+    hmin times larger.  With beta zero this is the classical controller;
+    a small beta damps oscillations of the step size.
+
+    The stages are kept in a single contiguous array, and every stage is
+    combined from the earlier ones it has nonzero coefficients for only,
+    in matrix-vector products over runs of consecutive stages, into work
+    arrays allocated once per run.  The states are of type dtype, which
+    may be float32 to halve the memory traffic of large systems, given an
+    rtol well above its resolution of about 1e-7, or complex; the times
+    stay double.  By default it follows y0, see Integrator.state_type(),
+    and y0 is not copied when it already is of that type.  The error of
+    complex states is measured on the moduli.
+    """
+    runner  = False
+    tableau = None
+    beta    = .04     # default of the beta option
+
+    def __init__(self,dt=.01,atol=1e-12,rtol=1e-6,S=.98,hmax=10.,hmin=.2,
+                 warm=False,jit=None,profile=False,callback=None,events=None,
+                 checkpoint=None,beta=None,dtype=None):
+        self.dt = dt
+        self.atol = atol
+        self.rtol = rtol
+        self.S    = S
+        self.hmin = hmin
+        self.hmax = hmax
+        if beta is not None:
+            self.beta = beta
+        # the type of the states, see Integrator.state_type(); scipy's ode
+        # reads it as scalar
+        self.dtype = dtype
+        if dtype is not None:
+            self.scalar = dtype
+        # With warm set, a run starting where the previous one ended keeps
+        # its stages, FSAL derivative, step size and error instead of
+        # estimating the initial step again.
+        self.warm = warm
+        self.last = None
+        # jit selects the compiled loop of ode_solvers.jit, see jit_rhs().
+        self.jit  = jit
+        # The work of every run is accumulated in stats, see Stats.  If
+        # given, callback(t,y) is called after every accepted step.
+        self.stats    = Stats(profile)
+        self.callback = callback
+        # events are located on the continuous extension of each step, see
+        # Events; a terminal one ends the run there and sets terminated to
+        # its (t,y).  Single states only.
+        self.events   = Events(events) if events is not None else None
+        self.terminated = None
+        # With a checkpoint, see checkpoint.Checkpoint, the state of runs
+        # is saved as they go, stages and step sizes included, and the run
+        # following restore() continues warm from there, warm set or not.
+        self.checkpoint = checkpoint
+        self.restored   = False
+
+    def reset(self,n,has_jac):
+        self.last = None
+        self.restored = False
+        self.stats.reset()
+        if self.events is not None:
+            self.events.reset()
+
+    def run(self,f,jac,y0,t0,t1,f_params,jac_params):
+        return self.march(f,y0,t0,t1,f_params)
+
+    def state(self,t,y,k=None,dt=None,errold=None):
+        # k, dt and errold are those of the run in progress, by default
+        # those the last run ended with.
+        if k is None and self.last is not None and \
+           amin(self.last[0]) == amin(t):
+            k, errold = self.last[2][1:], self.last[3]
+        state = dict(method=type(self).__name__, t=t, y=y,
+                     dt=self.dt if dt is None else dt, **self.stats.state())
+        if k is not None:
+            state['k'] = k
+            state['errold'] = errold
+        return state
+
+    def restore(self,state):
+        self.stats.restore(state)
+        self.dt = state['dt']
+        self.last = None
+        if 'k' in state:
+            y, k = state['y'], state['k']
+            K = empty((len(k) + 1,) + k.shape[1:], dtype=k.dtype)
+            K[1:] = k
+            self.last = (state['t'], y.reshape(-1, y.shape[-1]), K,
+                         state['errold'])
+            self.restored = True
+
+    def step_size(self,f,t,y,f_params):
+        # the smallest of the members' steps for an ensemble
+        return amin(self.dt)
+
+    def extend(self,rhs,t,h,Kf,step):
+        # computes the stages past those of a step that the continuous
+        # extension of the step h from the state Kf[0] at t needs, with the
+        # weights of the step, see march().
+        W, runs, hs, ys = step
+        c  = self.tableau.c
+        yt = empty_like(Kf[0]).reshape(len(t), -1)
+        for i in range(self.tableau.stages, len(c)):
+            combine(W[i], runs[i], Kf, hs, ys, yt)
+            Kf[i+1] = rhs(t + c[i] * h, yt).reshape(-1)
+
+    def run_dense(self,f,jac,y0,t0,t_eval,f_params,jac_params,out=None):
+        # integrate from t=t0 to the last of the increasing times t_eval in a
+        # single pass, filling out[i] with the solution at t_eval[i].  Output
+        # times do not limit the step size; the solution is evaluated from
+        # the continuous extension of each accepted step.
+        t_eval = asarray(t_eval, dtype=float)
+        yo     = asarray(y0)
+        if out is None:
+            out = empty((len(t_eval),) + yo.shape, dtype=self.state_type(yo))
+        outm = out.reshape(len(t_eval), -1, yo.shape[-1])
+
+        j = searchsorted(t_eval, t0, 'right')
+        outm[:j] = yo.reshape(-1, yo.shape[-1])
+
+        def accepted(t, tn, h, Y, k, acc):
+            lo = searchsorted(t_eval, t, 'right')
+            hi = searchsorted(t_eval, tn, 'right')
+            for r in nonzero(acc & (hi > lo))[0]:
+                theta = (t_eval[lo[r]:hi[r]] - t[r]) / h[r]
+                outm[lo[r]:hi[r],r] = self.interpolate(theta,h[r],Y[r],k[:,r])
+
+        y, t = self.march(f,y0,t0,t_eval[-1],f_params,accepted)
+        if self.terminated is not None:
+            out[searchsorted(t_eval, self.terminated[0], 'right'):] = nan
+        else:
+            # the state the run ends in, rather than its interpolant
+            out[-1] = y
+        return out
+
+    def interpolate(self,theta,h,y,k):
+        # continuous extension at the fractions theta of the step h from y
+        # with stages k.
+        P = self.tableau.P
+        Q = dot(asarray(theta)[...,newaxis] ** arange(1,P.shape[1]+1), P.T)
+        return y + h * dot(Q, k)
+
+    def march(self,f,y0,t0,t1,f_params,accepted=None):
+        # y0 may be a single state of shape (n,) or an ensemble of shape
+        # (m,n).  In the latter case f is called once per stage on the
+        # whole ensemble with t a column of per-member times of shape (m,1),
+        # and every member keeps its own step size in self.dt.  If given,
+        # accepted(t,tn,h,Y,k,acc) is called before the members acc advance
+        # from Y at times t to tn by steps h with stages k.
+        st = self.stats
+        st.start()
+        yo = self.as_state(y0)
+        batch = yo.ndim > 1
+        Y  = yo.reshape(-1, yo.shape[-1])
+        m  = Y.shape[0]
+
+        fs = st.rhs(f)
+        if batch:
+            def rhs(t, y):
+                return fs(t[:,newaxis], y, *f_params)
+        else:
+            def rhs(t, y):
+                return asarray(fs(t[0], y[0], *f_params))[newaxis]
+
+        tab = self.tableau
+        s   = tab.stages
+        c   = tab.c
+        A, Ar, Ab, Abr, E, Er, E3, E3r = weights(tab, Y.dtype)
+        # exponents of the controller for rejected and accepted steps
+        beta  = self.beta
+        q1    = 1. / (tab.error_order + 1)
+        alpha = q1 - .75*beta
+        dense = len(c) > s and \
+                (accepted is not None or self.events is not None)
+
+        t = zeros(m) + t0
+        restored, self.restored = self.restored, False
+        if (self.warm or restored) and self.last is not None \
+           and amin(self.last[0]) == t0 and array_equal(self.last[1], Y):
+            # Resume from the state of the previous run; k[0] still holds
+            # the derivative at (t0,y0).  The members of an ensemble
+            # resumed from a checkpoint may be at different times.
+            K  = self.last[2]
+            t  = zeros(m) + self.last[0]
+            dt = zeros(m) + self.dt
+            eo = zeros(m) + self.last[3]
+        else:
+            K  = zeros((len(c) + 1,) + Y.shape, dtype=Y.dtype)
+            dt = self.initial_step(rhs,t,Y,K[1:])
+            eo = zeros(m) + 1e-4
+        # The state is kept in the first row of K and the stages k in the
+        # others, so a stage is combined from both in one pass.
+        K[0] = Y
+        Y  = K[0]
+        k  = K[1:]
+        Kf = K.reshape(len(K), -1)
+
+        ev = self.events
+        cp = self.checkpoint
+        self.terminated = None
+        if ev is not None:
+            if batch:
+                raise ValueError('events need a single state')
+            ev.start(t0, Y[0], f_params)
+
+        fc = None
+        if accepted is None and self.callback is None and ev is None \
+           and cp is None and not batch and Y.dtype == float64:
+            fc = jit_rhs(f,self.jit)
+        if fc is not None:
+            y, t[0], dt[0], eo[0], na, nr, hlo, hhi, hlast = \
+              jit_loop('rk_embedded')(fc, Y[0], t[0], float(t1), dt[0],
+                                      eo[0], k[:,0], s, tab.a, c, tab.e,
+                                      tab.e3 if E3 is not None else zeros(0),
+                                      alpha, q1, beta, self.atol, self.rtol,
+                                      self.S, self.hmax, self.hmin,
+                                      tuple(f_params))
+            Y[0] = y
+            st.add((s - 1)*(na + nr), na, nr, hlo, hhi, hlast)
+
+        # work arrays: the weights of a step, the stage state, which ends
+        # up holding the new state, the error estimate and the error scale
+        W     = empty_like(A)
+        We    = empty_like(E)
+        We3   = None if E3 is None else empty_like(E3)
+        yt    = empty_like(Y)
+        Delta = empty_like(Y)
+        scale = empty(Y.shape, dtype=Y.real.dtype)
+        n     = Y.shape[1]
+
+        # Integration loop
+        while any(t < t1):
+            # Members that have reached t1 take steps of zero length; the
+            # step actually taken is clipped so the final one hits t1.
+            active = t < t1
+            h      = where(active, minimum(dt, t1 - t), 0.)
+            last   = active & (dt >= t1 - t)
+
+            if m == 1:
+                # the step size goes into the weights, and a stage is a
+                # single matrix-vector product
+                step = (W, Ar, None, None)
+                multiply(A, h[0], out=W)
+                W[:,0] = 1.
+                multiply(E, h[0], out=We)
+                if E3 is not None:
+                    multiply(E3, h[0], out=We3)
+                errs = (We, We3, None)
+            else:
+                # every member scales its stages by its own step size
+                hc   = h[:,newaxis]
+                step = (Ab, Abr, hc, Y)
+                errs = (E, E3, hc)
+
+            # Compute ki to include the estimate at y_{n+1}
+            # This is for FSAL (first-same-as-last)
+            Ws, runs, hs, ys = step
+            for i in range(1,s):
+                combine(Ws[i], runs[i], Kf, hs, ys, yt)
+                k[i] = rhs(t + c[i] * h, yt)
+
+            yn   = yt # higher order estimate was computed
+
+            #Errors
+            absolute(yn, out=scale)
+            maximum(scale, absolute(Y), out=scale)
+            scale *= self.rtol
+            scale += self.atol
+
+            # Delta: higher order minus embedded
+            combine(errs[0], Er, Kf, errs[2], None, Delta)
+            Delta /= scale
+            err   = sqrt( squares(Delta) / n )
+            if E3 is not None:
+                # DOP853: the fifth-order estimate, damped where the
+                # third-order one is much larger
+                combine(errs[1], E3r, Kf, errs[2], None, Delta)
+                Delta /= scale
+                err3   = sqrt( squares(Delta) / n )
+                den    = sqrt(err**2 + .01*err3**2)
+                err    = where(den > 0., err**2 / where(den > 0., den, 1.), 0.)
+            ierr  = 1./maximum(err, 1e-10)
+            fac   = self.S * ierr ** alpha
+            if beta:
+                fac  *= eo ** beta
+                facr  = self.S * ierr ** q1
+            else:
+                facr  = fac
+
+            # Forward or not, depending of the error values
+            acc = active & (err <= 1.)
+            rej = active & (err >  1.)
+
+            tn  = where(last, t1, t + h)
+            if dense and any(acc):
+                self.extend(rhs,t,h,Kf,step)
+            if accepted is not None and any(acc):
+                accepted(t, tn, h, Y, k, acc)
+            stop = None
+            if ev is not None and acc[0]:
+                to, ho, Yo, ko = t[0], h[0], Y[0], k[:,0]
+                stop = ev.check(to, tn[0], yn[0], lambda s:
+                                self.interpolate((s - to)/ho, ho, Yo, ko))
+
+            t[acc]  = tn[acc]
+            if acc.all():
+                Y[...]  = yn
+                k[0]    = k[s-1] # FSAL assignment
+            else:
+                Y[acc]  = yn[acc]
+                k[0][acc] = k[s-1][acc]
+            grow    = acc & ~last
+            dt[grow] = minimum(fac[grow] * h[grow], self.hmax*h[grow])
+            dt[rej] = maximum(facr[rej] * h[rej], self.hmin*h[rej])
+            eo[acc] = maximum(err[acc], 1e-4)
+
+            st.accept(h[acc])
+            st.nreject += count_nonzero(rej)
+            if self.callback is not None and any(acc):
+                if batch:
+                    self.callback(t, Y)
+                else:
+                    self.callback(t[0], Y[0])
+            if stop is not None:
+                t[0], Y[0] = self.terminated = stop
+                break
+            if cp is not None and any(acc) and cp.due():
+                cp.save(self.state(t,Y.reshape(yo.shape),k,dt,eo))
+
+        self.dt = dt if batch else dt[0]
+        if self.warm and self.terminated is None:
+            self.last = (t1, Y.copy(), K, eo)
+        else:
+            self.last = None
+        st.stop()
+        if isfinite(Y).all(): self.success = True
+        return Y.reshape(yo.shape).copy(), t.min()
+
+    def initial_step(self,rhs,t,Y,k):
+        # Primes k[0] with the derivative at (t,Y) and returns an estimate
+        # of the initial step size for every member.
+        dt = zeros(len(t)) + self.dt
+
+        # Prime k for FSAL
+        k[0] = rhs(t, Y)
+        
+        scale = self.atol + self.rtol*abs(Y)
+        dnf = sum( abs(k[0] / scale)**2, axis=1 )
+        dny = sum( abs(Y / scale)**2, axis=1 )
+        
+        dt[(dnf <= 1e-10) | (dny <= 1e-10)] = 1e-6
+        
+        # Perform an explicit Euler step:
+        yn = Y + k[0] * dt[:,newaxis]
+        k[1] = rhs(t + dt, yn) 
+        
+        # Estimate the second derivative of the solution:
+        der2 = sum( sqrt( abs(k[1] - k[0]) / scale ), axis=1 ) / dt
+        
+        # step size is computed such that
+        # h**order * max(norm(k[0]),norm(der2)) = 0.01
+        der12 = maximum( abs(der2), sqrt(dnf) )
+        dtn   = maximum(1e-6, abs(dt)*1e-3)
+        big   = der12 > 1e-15
+        dtn[big] = (0.01/der12[big])**(1./self.tableau.order)
+        return minimum( 100.0 * dt, minimum(dtn, self.hmax) )
+
+def runs(w):
+    # the (lo,hi) ranges of consecutive nonzero entries of w
+    r = []
+    for j, x in enumerate(w):
+        if x == 0.:
+            continue
+        if r and r[-1][1] == j:
+            r[-1] = (r[-1][0], j + 1)
+        else:
+            r.append((j, j + 1))
+    return r
+
+_weights = {}
+
+def weights(tab, dtype):
+    # the weights of the tableau tab indexed like the rows of K in march(),
+    # the state and then the stages, of type dtype, each followed by its
+    # runs of nonzero entries: for the state of every stage, those of a
+    # single state with the step size to multiply in and those of the
+    # stages of an ensemble, then for the two error estimates.
+    key = (tab, dtype)
+    if key not in _weights:
+        A  = hstack((ones((len(tab.a), 1)), tab.a)).astype(dtype)
+        Ab = A.copy()
+        Ab[:,0] = 0.
+        E  = hstack((0., tab.e)).astype(dtype)
+        E3 = None if tab.e3 is None else hstack((0., tab.e3)).astype(dtype)
+        _weights[key] = (A, [runs(w) for w in A], Ab, [runs(w) for w in Ab],
+                         E, runs(E), E3, None if E3 is None else runs(E3))
+    return _weights[key]
+
+def squares(D):
+    # the squared norms of the rows of D, of the moduli for complex ones
+    if iscomplexobj(D):
+        return einsum('ij,ij->i', D.real, D.real) + \
+               einsum('ij,ij->i', D.imag, D.imag)
+    return einsum('ij,ij->i', D, D)
+
+def combine(w, runs, Kf, h, y, out):
+    # out = sum(w[j] * K[j]) over the runs (lo,hi) of nonzero weights only,
+    # with the rows of K flattened in Kf, each run a single matrix-vector
+    # product.  For an ensemble, out is then scaled by the step sizes h of
+    # shape (m,1) and the states y, if given, are added.
+    flat = out.reshape(-1)
+    if not runs:
+        flat[...] = 0.
+    for i, (lo, hi) in enumerate(runs):
+        if i == 0:
+            dot(w[lo:hi], Kf[lo:hi], out=flat)
+        else:
+            flat += dot(w[lo:hi], Kf[lo:hi])
+    if h is not None:
+        out *= h
+    if y is not None:
+        out += y
@@ -14,41 +14,26 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
-from scipy.integrate._ode import IntegratorBase
-from numpy import array, isfinite
+from ode_solvers.Integrator import register
+from ode_solvers.FixedStep import FixedStep
+from numpy import multiply
  
-class EulerRichardson(IntegratorBase):
+class EulerRichardson(FixedStep):
     runner = True
+    order  = 2
+    work   = 2
  
-    def __init__(self,dt=.01):
-        self.dt = dt
- 
-    def reset(self,n,has_jac):
-        pass
- 
-    def run(self,f,jac,y0,t0,t1,f_params,jac_params):
-      # this method is called to integrate from t=t0 to t=t1
-      # with initial condition y0. f and jac are user-supplied functions
-      # that define the problem. f_params,jac_params are additional
-      # arguments to these functions.
+    def step(self,f,t,y,fy,dt,f_params):
+      ymid = y + fy * dt/2
+      return y + f(t+dt/2,ymid,*f_params) * dt
 
-      yo = array(y0) # Initial condition
-      t = t0
-      dt = self.dt
-
-      while t < t1:
-   
-        # For last value of dt:
-        if t + dt > t1:
-          dt = t1 - t
-        
-        ymid = yo + f(t,yo,*f_params) * dt/2
-        yn = yo + f(t+dt/2,ymid,*f_params) * dt
-        yo = yn.copy()
-        t += dt
- 
-      if isfinite(yn[-1]): self.success = True # Check for success
-      return yn,t
+    def step_into(self,f,t,y,fy,dt,f_params,out,w):
+      ymid, fmid = w
+      multiply(fy, dt/2, out=ymid)
+      ymid += y
+      f(t+dt/2,ymid,fmid,*f_params)
+      multiply(fmid, dt, out=out)
+      out += y
  
 if EulerRichardson.runner:
-    IntegratorBase.integrator_classes.append(EulerRichardson)
+    register(EulerRichardson)
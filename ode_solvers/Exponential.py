@@ -0,0 +1,154 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.FixedStep import FixedStep
+from numpy import asarray, zeros, ones, eye, exp, abs, concatenate, \
+                  column_stack
+from scipy.linalg import expm
+from scipy.sparse import issparse, csr_matrix, bmat, diags
+from scipy.sparse.linalg import LinearOperator, aslinearoperator, \
+                                expm_multiply
+from math import factorial
+
+class Exponential(FixedStep):
+    """
+    Exponential integrators for semi-linear systems
+
+      dy/dt = A y + N(t,y),
+
+    with a stiff linear part A, such as diffusion or wave operators, and a
+    mild nonlinear part N.  The linear part is integrated exactly through
+    the functions phi_0(z) = exp(z), phi_k(z) = (phi_{k-1}(z) - 1/(k-1)!)/z
+    of h*A, so the step size is limited by the accuracy of N only, not by
+    the stiffness of A as for the explicit methods.  The function given to
+    the integrator is N(t,y,*f_params), not the derivative of y.
+
+    A is a dense matrix, a 1-D array holding a diagonal matrix (e.g. the
+    Fourier multipliers of a spectral method), a sparse matrix or a
+    LinearOperator.  For the first two the phi-functions of the step sizes
+    in use are computed once and cached.  For the others, or with krylov
+    set, they are never formed: every stage is one call of scipy's
+    expm_multiply on an operator extended by the vectors they multiply
+    (Al-Mohy and Higham, 2011), and the state must be a vector.  A
+    LinearOperator needs scipy 1.9 or later and its rmatvec.
+
+    The other options are those of FixedStep.
+    """
+    runner = False
+    phis   = 1       # highest phi-function used by the method
+    cached = 8       # step sizes whose phi-functions are kept
+
+    def __init__(self,A,dt=.01,krylov=None,profile=False,callback=None,
+                 events=None,checkpoint=None,rtol=None,atol=None,
+                 adaptive=False):
+      FixedStep.__init__(self,dt,False,profile,callback,events,checkpoint,
+                         rtol,atol,adaptive)
+      operator = issparse(A) or isinstance(A, LinearOperator)
+      self.krylov = operator if krylov is None else krylov
+      if self.krylov:
+        self.A = A if operator else asarray(A, dtype=float)
+        if issparse(A):
+          self.A = csr_matrix(A, dtype=float)
+      else:
+        self.A = asarray(A.toarray() if issparse(A) else A, dtype=float)
+      self.diagonal = not self.krylov and self.A.ndim == 1
+      self.cache = {}
+
+    def matvec(self,M,y):
+      # the product of the matrix M, of the form of A, with the states y.
+      if self.diagonal:
+        return M * y
+      if issparse(M) or isinstance(M, LinearOperator):
+        return M.dot(y)
+      return y.dot(M.T)
+
+    def coefficients(self,h):
+      # the coefficients of tabulate() for the step size h, cached.
+      if h not in self.cache:
+        if len(self.cache) >= self.cached:
+          self.cache.clear()
+        self.cache[h] = self.tabulate(h)
+      return self.cache[h]
+
+    def tabulate(self,h):
+      # the matrices, or diagonals, applied by step() for the step size h.
+      return self.phi(h)
+
+    def phi(self,h,p=None):
+      # returns [phi_0(h*A), ..., phi_p(h*A)], by default to self.phis.
+      p = self.phis if p is None else p
+      if self.diagonal:
+        z = h * self.A
+        P = [exp(z)]
+        for k in range(1, p + 1):
+          P.append(phi_k(z, k, P[-1]))
+      else:
+        # the top row of the exponential of [[h*A, I, 0, ...], [0, 0, I,
+        # ...], ...] holds the phi_k(h*A) (Higham, 2008, 10.7.4).
+        n = len(self.A)
+        M = zeros(((p + 1) * n, (p + 1) * n))
+        M[:n,:n] = h * self.A
+        for k in range(p):
+          M[k*n:(k+1)*n,(k+1)*n:(k+2)*n] = eye(n)
+        E = expm(M)
+        P = [E[:n,k*n:(k+1)*n] for k in range(p + 1)]
+      return P
+
+    def combine(self,h,v,w):
+      # exp(h*A) v + sum_k h**k phi_k(h*A) w[k-1], by a single
+      # expm_multiply of the operator [[A, W], [0, J]], W = [w_p ... w_1]
+      # and J the shift, on [v, e_p] (Al-Mohy and Higham, 2011, 2.1).
+      A, n, p = self.A, len(v), len(w)
+      x = concatenate((v, zeros(p)))
+      x[-1] = 1.
+      J = diags([ones(p - 1)], [1], shape=(p, p))
+      if issparse(A) or not isinstance(A, LinearOperator):
+        W = csr_matrix(column_stack(w[::-1]))
+        B = bmat([[csr_matrix(A), W], [None, J]], format='csr')
+        return expm_multiply(h * B, x)[:n]
+      W = column_stack(w[::-1])
+      def matvec(x):
+        x = x.ravel()
+        return concatenate((A.matvec(x[:n]) + W.dot(x[n:]), J.dot(x[n:])))
+      def rmatvec(x):
+        # for the norm estimate of expm_multiply
+        x = x.ravel()
+        return concatenate((A.rmatvec(x[:n]), W.T.dot(x[:n]) + J.T.dot(x[n:])))
+      B = LinearOperator((n + p, n + p), matvec=matvec, rmatvec=rmatvec,
+                         dtype=float)
+      # the trace of an operator is unknown, which only costs the shift
+      # of expm_multiply
+      return expm_multiply(aslinearoperator(h * B), x, traceA=0.)[:n]
+
+    def interpolate(self,theta,dt,y0,f0,y1,f1):
+      # the Hermite interpolant of FixedStep, with the derivatives A y + N.
+      A = self.A
+      return FixedStep.interpolate(self,theta,dt,y0,f0 + self.matvec(A,y0),
+                                   y1,f1 + self.matvec(A,y1))
+
+def phi_k(z, k, phi):
+    # phi_k(z) elementwise from phi = phi_{k-1}(z), by the recurrence where
+    # it is accurate and by the Taylor series sum_j z**j/(j+k)! near 0.
+    small = abs(z) < 1
+    out = (phi - 1. / factorial(k - 1)) / (z + small)
+    zs  = z[small]
+    term = ones(zs.shape) / factorial(k)
+    s = term.copy()
+    for j in range(1, 20):
+      term = term * zs / (j + k)
+      s += term
+    out[small] = s
+    return out
@@ -0,0 +1,39 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import register
+from ode_solvers.Exponential import Exponential
+
+class ExponentialEuler(Exponential):
+    """
+    First order exponential Euler method,
+
+      y1 = exp(h*A) y + h*phi_1(h*A) N(t,y),
+
+    exact for a constant N.  One evaluation of N per step.
+    """
+    runner = True
+    order  = 1
+    phis   = 1
+
+    def step(self,f,t,y,fy,dt,f_params):
+      if self.krylov:
+        return self.combine(dt,y,[fy])
+      E, P1 = self.coefficients(dt)
+      return self.matvec(E,y) + dt * self.matvec(P1,fy)
+
+if ExponentialEuler.runner:
+    register(ExponentialEuler)
@@ -0,0 +1,408 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import Integrator, rms
+from ode_solvers.Stats import Stats
+from ode_solvers.events import Events
+from numpy import array, asarray, isfinite, ceil, linspace, empty, \
+                  empty_like, searchsorted, nan, maximum, inf
+
+SEGMENT    = 4      # steps of the segment dt is chosen on
+MIN_FACTOR = 0.2
+MAX_FACTOR = 4.
+
+class FixedStep(Integrator):
+    """
+    Common driver for the fixed-step integrators.  Subclasses only define
+    step(), which advances the state y at time t by dt given the derivative
+    fy = f(t,y) at the start of the step.  If uniform is set, the interval
+    [t0,t1] is divided into equally spaced steps no larger than dt instead
+    of truncating the last step.
+
+    With inplace set, f is called as f(t,y,out,*f_params) and must write
+    the derivative into out.  The state and the work arrays of the method
+    are then allocated once per run and the steps are taken through
+    step_into(), which allocates nothing.
+
+    The work of every run is accumulated in stats, see Stats; with profile
+    set it includes the time spent in f.  If given, callback(t,y) is called
+    after every step, with y a buffer of the integrator that must be copied
+    to be kept.
+
+    events are event functions g(t,y,*f_params), see Events, located on the
+    cubic Hermite interpolant of each step; a run ended by a terminal event
+    returns the state at the event and sets terminated to its (t,y).
+
+    With a checkpoint, see checkpoint.Checkpoint, the state of runs is saved
+    as they go.  It holds the attributes listed in memory, which the method
+    carries from step to step, and the start of the grid of the run, so a
+    resumed run takes the very steps the interrupted one would have.
+
+    Given rtol or atol (the other defaulting to 1e-3 or 1e-6), dt is not
+    used as is but chosen, at the start of the first run, for the local
+    error of every step to be within atol + rtol*|y| as for the adaptive
+    methods: a few steps of dt and twice as many of dt/2 from y0, whose
+    difference estimates the error of the method of the given order, show
+    how large the steps can be.  With adaptive set, the step size is
+    instead adjusted all along, from dt for the first step: every step is
+    also taken as two halves, kept if the difference is within the
+    tolerance and retried smaller otherwise, which costs about three times
+    the work of a step.  Methods with a memory cannot adapt.
+
+    The states are of type dtype, by default float64, or complex128 for a
+    complex y0, see Integrator.state_type(); float32 halves the memory
+    traffic of large ensembles.  y0 is not copied when it already is of
+    that type.
+    """
+    runner  = False
+    uniform = False
+    order   = None   # order of the method, for the tolerance
+    work    = 0      # number of work arrays used by step_into()
+    memory  = ()     # attributes kept from one step to the next
+    origin  = None   # start of the grid of the current run
+    resume  = None   # state the next run resumes from, see restore()
+
+    def __init__(self,dt=.01,inplace=False,profile=False,callback=None,
+                 events=None,checkpoint=None,rtol=None,atol=None,
+                 adaptive=False,dtype=None):
+      self.dt = self.dt_given = dt
+      self.inplace = inplace
+      self.callback = callback
+      self.stats = Stats(profile)
+      self.events = Events(events) if events is not None else None
+      self.terminated = None
+      self.checkpoint = checkpoint
+      self.rtol = self.atol = None
+      if rtol is not None or atol is not None or adaptive:
+        if self.order is None:
+          raise ValueError('%s has no order to choose dt from a tolerance'
+                           % type(self).__name__)
+        self.rtol = 1e-3 if rtol is None else rtol
+        self.atol = 1e-6 if atol is None else atol
+      if adaptive and self.memory:
+        raise ValueError('%s carries %s from step to step and cannot adapt '
+                         'its step size' % (type(self).__name__,
+                                            ', '.join(self.memory)))
+      self.adaptive = adaptive
+      if dtype is not None:
+        # scipy's ode reads it as scalar
+        self.dtype = self.scalar = dtype
+      self.selected = False   # whether dt was chosen from the tolerance
+      self.h = None           # next step size when adaptive
+
+    def reset(self,n,has_jac):
+      self.dt = self.dt_given
+      self.selected = False
+      self.h = None
+      self.stats.reset()
+      if self.events is not None:
+        self.events.reset()
+
+    def restart(self):
+      # called at the start of every run; multistep methods clear their
+      # history here.
+      pass
+
+    def begin(self,t0):
+      # starts a run from t0, resuming the checkpointed one if it was there.
+      state, self.resume = self.resume, None
+      if state is not None and 'origin' in state and state['t'] == t0:
+        self.origin = state['origin'].item()
+        for name in self.memory:
+          setattr(self, name, state[name] if name in state else None)
+        if 'dt' in state:
+          self.dt = state['dt'].item()
+          self.selected = True
+        if 'h' in state:
+          self.h = state['h'].item()
+      else:
+        self.origin = t0
+        self.restart()
+
+    def state(self,t,y):
+      state = dict(method=type(self).__name__, t=t, y=y, **self.stats.state())
+      if self.origin is not None:
+        # taken during a run
+        state['origin'] = self.origin
+        for name in self.memory:
+          if getattr(self, name) is not None:
+            state[name] = getattr(self, name)
+        if self.selected:
+          state['dt'] = self.dt
+        if self.h is not None:
+          state['h'] = self.h
+      return state
+
+    def restore(self,state):
+      self.stats.restore(state)
+      self.resume = state
+
+    def step(self,f,t,y,fy,dt,f_params):
+      raise NotImplementedError
+
+    def select(self,f,y0,t0,t1,f_params):
+      # chooses dt from the tolerance at the start of the first run, by
+      # step doubling on a segment of SEGMENT steps of h from y0: the
+      # difference with the state reached in steps of h/2 is 2**p - 1 times
+      # the error of the latter, which gives the step size with the error
+      # per step within the tolerance.  Repeated while the size found is
+      # far from the one tried.  A run of zero length leaves it to the
+      # next one.
+      if self.rtol is None or self.adaptive or self.selected or t1 <= t0:
+        return
+      if self.inplace:
+        fi = f
+        f  = lambda t,y,*p: fi(t,y,empty_like(y),*p)
+      p  = self.order
+      y0 = self.as_state(y0)
+      h  = self.dt
+      for i in range(3):
+        h  = min(h, (t1 - t0) / float(SEGMENT))
+        y1 = self.trial(f,y0,t0,h,SEGMENT,f_params)
+        y2 = self.trial(f,y0,t0,h/2,2*SEGMENT,f_params)
+        scale = self.atol + self.rtol * maximum(abs(y0), abs(y2))
+        err   = rms((y2 - y1) / scale) / ((2**p - 1) * 2*SEGMENT)
+        # from the error per step of h/2, with a safety factor of 0.9
+        factor = 0.45 * err**(-1./(p+1)) if err > 0 else inf
+        # by at most as much as two adaptive steps
+        h *= min(MAX_FACTOR**2, max(MIN_FACTOR**2, factor))
+        if 0.5 < factor < 2 or not isfinite(err):
+          break
+      if h > 0:
+        self.dt = h
+        self.selected = True
+      self.restart()
+
+    def trial(self,f,y,t,h,n,f_params):
+      # n steps of h from y at t, outside of the run.
+      self.restart()
+      for i in range(n):
+        y = self.step(f,t + i*h,y,f(t + i*h,y,*f_params),h,f_params)
+      return y
+
+    def doubled(self,f,t,y,fy,dt,f_params):
+      # step() by step doubling: advances y by dt in substeps, each taken
+      # whole and as two halves and retried smaller until the difference,
+      # 2**p - 1 times the error of the halves, is within the tolerance.
+      # The halves are kept, and the size of the next step left in h.
+      p    = self.order
+      end  = t + dt
+      h    = dt
+      full = dt == self.h
+      while True:
+        last = t + h >= end
+        if last:
+          h = end - t
+        y1 = self.step(f,t,y,fy,h,f_params)
+        ym = self.step(f,t,y,fy,h/2,f_params)
+        y2 = self.step(f,t+h/2,ym,f(t+h/2,ym,*f_params),h/2,f_params)
+        scale  = self.atol + self.rtol * maximum(abs(y), abs(y2))
+        err    = rms((y2 - y1) / scale) / (2**p - 1)
+        factor = MAX_FACTOR if err == 0 else \
+                 min(MAX_FACTOR, max(MIN_FACTOR, 0.9 * err**(-1./(p+1))))
+        if err <= 1 or not isfinite(err):
+          t, y = t + h, y2
+          if last:
+            # a step cut short at the end of the run says nothing of
+            # larger ones
+            self.h = h * factor if full or h < dt else \
+                     max(h * factor, self.h)
+            return y
+          fy = f(t,y,*f_params)
+        else:
+          self.stats.nreject += 1
+        h *= factor
+
+    def step_into(self,f,t,y,fy,dt,f_params,out,w):
+      # in-place counterpart of step(): f writes into its third argument,
+      # the new state goes to out and w holds self.work scratch arrays.
+      # Methods without an in-place kernel fall back on step().
+      fa = lambda t,y,*p: f(t,y,empty_like(y),*p)
+      out[...] = self.step(fa,t,y,fy,dt,f_params)
+
+    def interpolate(self,theta,dt,y0,f0,y1,f1):
+      # cubic Hermite interpolant between (y0,f0) and (y1,f1), evaluated at
+      # the fractions theta of the step dt.
+      return (1-theta)*y0 + theta*y1 + theta*(theta-1) * \
+             ((1-2*theta)*(y1-y0) + (theta-1)*dt*f0 + theta*dt*f1)
+
+    def grid(self,t0,t1):
+      # yields the (t,dt) pair of every step from t0 to t1.
+      if self.adaptive:
+        # doubled() sets the size of the next step
+        t = t0
+        if self.h is None:
+          self.h = self.dt
+        while t < t1:
+          dt = min(self.h, t1 - t)
+          yield t, dt
+          t += dt
+      elif self.uniform:
+        # a resumed run continues the grid of the run it was taken from
+        to = self.origin if self.origin is not None else t0
+        n = max(int(ceil((t1-to)/self.dt)), 1)
+        times = linspace(to,t1,num=n+1,endpoint=True)
+        for i in range(searchsorted(times, t0), n):
+          yield times[i], times[i+1] - times[i]
+      else:
+        t  = t0
+        dt = self.dt
+        while t < t1:
+          # For last value of dt:
+          if t + dt > t1:
+            dt = t1 - t
+          yield t, dt
+          t += dt
+
+    def run(self,f,jac,y0,t0,t1,f_params,jac_params):
+      # this method is called to integrate from t=t0 to t=t1
+      # with initial condition y0. f and jac are user-supplied functions
+      # that define the problem. f_params,jac_params are additional
+      # arguments to these functions.
+
+      self.stats.start()
+      f = self.stats.rhs(f)
+      self.begin(t0)
+      self.select(f,y0,t0,t1,f_params)
+      if self.events is not None:
+        yn,t = self.march_dense(f,self.as_state(y0),t0,t1,f_params)
+      elif self.inplace and not self.adaptive:
+        # march_into() takes the state as one of its buffers
+        yn,t = self.march_into(f,array(y0,dtype=self.state_type(y0)),t0,t1,
+                               f_params)
+      else:
+        yn,t = self.march(f,self.as_state(y0),t0,t1,f_params)
+      self.origin = None
+      self.stats.stop()
+
+      if isfinite(yn).all(): self.success = True # Check for success
+      return yn,t
+
+    def march(self,f,yo,t0,t1,f_params):
+      if self.inplace:
+        fi = f
+        f  = lambda t,y,*p: fi(t,y,empty_like(y),*p)
+      step = self.doubled if self.adaptive else self.step
+      cp = self.checkpoint
+      yn = yo
+      t  = t0
+      for ts, dt in self.grid(t0,t1):
+        yn = step(f,ts,yo,f(ts,yo,*f_params),dt,f_params)
+        yo = yn
+        t  = ts + dt
+        self.stats.accept(dt)
+        if self.callback is not None:
+          self.callback(t,yn)
+        if cp is not None and cp.due():
+          cp.save(self.state(t,yn))
+      return yn,t
+
+    def march_into(self,f,yo,t0,t1,f_params):
+      # allocation-free version of march() for in-place right-hand sides.
+      cp = self.checkpoint
+      yn = empty_like(yo)
+      fy = empty_like(yo)
+      w  = [empty_like(yo) for i in range(self.work)]
+      t  = t0
+
+      for ts, dt in self.grid(t0,t1):
+        f(ts,yo,fy,*f_params)
+        self.step_into(f,ts,yo,fy,dt,f_params,yn,w)
+        yo, yn = yn, yo
+        t  = ts + dt
+        self.stats.accept(dt)
+        if self.callback is not None:
+          self.callback(t,yo)
+        if cp is not None and cp.due():
+          cp.save(self.state(t,yo))
+      return yo,t
+
+    def run_dense(self,f,jac,y0,t0,t_eval,f_params,jac_params,out=None):
+      # integrate from t=t0 to the last of the increasing times t_eval in a
+      # single pass, filling out[i] with the solution at t_eval[i].  The
+      # steps are not shortened to hit the output times; the solution is
+      # interpolated from the derivatives at either end of each step, which
+      # are computed by the stepping anyway.  Output times after a
+      # terminal event are filled with nan.
+
+      t_eval = asarray(t_eval, dtype=float)
+      yo     = self.as_state(y0)
+      if out is None:
+        out = empty((len(t_eval),) + yo.shape, dtype=yo.dtype)
+      self.stats.start()
+      f = self.stats.rhs(f)
+      self.begin(t0)
+      self.select(f,yo,t0,t_eval[-1],f_params)
+      yn,t = self.march_dense(f,yo,t0,t_eval[-1],f_params,t_eval,out)
+      self.origin = None
+      self.stats.stop()
+
+      if isfinite(yn).all(): self.success = True
+      return out
+
+    def march_dense(self,f,yo,t0,t1,f_params,t_eval=None,out=None):
+      # march() keeping the derivatives at both ends of every step, which
+      # give the interpolant for the output times t_eval and the events.
+      if self.inplace:
+        fi = f
+        f  = lambda t,y,*p: fi(t,y,empty_like(y),*p)
+      step = self.doubled if self.adaptive else self.step
+      ev = self.events
+      cp = self.checkpoint
+      self.terminated = None
+      if t_eval is not None:
+        shape = (-1,) + (1,)*yo.ndim
+        j = searchsorted(t_eval, t0, 'right')
+        out[:j] = yo
+      if ev is not None:
+        if yo.ndim > 1:
+          raise ValueError('events need a single state')
+        ev.start(t0,yo,f_params)
+
+      fo = f(t0,yo,*f_params)
+      tn = t0
+      for t, dt in self.grid(t0,t1):
+        yn = step(f,t,yo,fo,dt,f_params)
+        fn = f(t+dt,yn,*f_params)
+        tn = t + dt
+        stop = None
+        if ev is not None:
+          stop = ev.check(t,tn,yn,lambda s: self.interpolate((s-t)/dt,dt,
+                                                           yo,fo,yn,fn))
+        if t_eval is not None:
+          k = searchsorted(t_eval, tn, 'right')
+          if k > j:
+            theta  = ((t_eval[j:k] - t)/dt).reshape(shape)
+            out[j:k] = self.interpolate(theta,dt,yo,fo,yn,fn)
+            if t_eval[k-1] == tn:
+              # the state at the end of the step is known exactly
+              out[k-1] = yn
+            j = k
+        yo, fo = yn, fn
+        self.stats.accept(dt)
+        if self.callback is not None:
+          self.callback(tn,yn)
+        if stop is not None:
+          tn, yo = self.terminated = stop
+          break
+        if cp is not None and cp.due():
+          cp.save(self.state(tn,yn))
+
+      if t_eval is not None:
+        out[j:] = yo
+        if self.terminated is not None:
+          out[searchsorted(t_eval, tn, 'right'):] = nan
+      return yo,tn
@@ -0,0 +1,181 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Base class and registry of the integrators.  The integrators are driven
+natively by ode_solvers.solve, and through scipy's ode by a thin shim:
+the registered classes are appended to the list scipy.integrate.ode
+searches, and Integrator carries the few attributes ode reads.  As
+scipy.integrate takes longer to import than the rest of the package, the
+list is only extended once something else imports it, see ScipyHook.
+"""
+from collections import OrderedDict
+import numpy
+import sys
+
+# every registered integrator class by name, in registration order
+integrators = OrderedDict()
+
+# the module of scipy's ode
+SCIPY_ODE = 'scipy.integrate._ode'
+
+class Integrator(object):
+  """
+  Base class of the integrators.  A subclass defines run(), which
+  integrates dy/dt = f(t,y,*f_params) from y0 at t0 to t1 and returns the
+  pair (y,t), setting success.  jac(t,y,*jac_params) is the Jacobian,
+  if reset() was told there is one.  run() is called repeatedly to continue
+  an integration, and reset() before every new initial value.
+  """
+  runner  = False   # whether register() should make the class available
+  success = None
+  checkpoint = None # a checkpoint.Checkpoint saving the state of runs
+  dtype   = None    # the type of the states, see state_type()
+
+  # read by scipy's ode, which casts the initial value to scalar: None
+  # keeps its type, for state_type() to decide
+  istate  = None
+  scalar  = None
+  supports_run_relax = None
+  supports_step      = None
+  supports_solout    = False
+
+  def reset(self,n,has_jac):
+    pass
+
+  def run(self,f,jac,y0,t0,t1,f_params,jac_params):
+    raise NotImplementedError
+
+  def state_type(self,y):
+    """
+    Returns the type of the states integrated from the initial value y:
+    dtype if set, else complex128 for a complex y and float64 otherwise.
+    Integer and float32 initial values are thus integrated in double
+    precision unless dtype asks for less.
+    """
+    if self.dtype is not None:
+      return numpy.dtype(self.dtype)
+    return numpy.dtype(complex if numpy.iscomplexobj(y) else float)
+
+  def as_state(self,y):
+    """
+    Returns y as a contiguous array of type state_type(y): y itself, not a
+    copy, when it already is one.
+    """
+    dtype = self.state_type(y)
+    if dtype.kind != 'c' and numpy.iscomplexobj(y):
+      raise TypeError('%s integrates states of type %s, not complex ones'
+                      % (type(self).__name__, dtype))
+    return numpy.ascontiguousarray(y, dtype=dtype)
+
+  def step_size(self,f,t,y,f_params):
+    """
+    Returns the size of the next step from y at t, used by Stepper.step().
+    """
+    return self.dt
+
+  def state(self,t,y):
+    """
+    Returns the state of the integration at the time t and state y, as a
+    dict of arrays from which restore() resumes it, see checkpoint.
+    """
+    raise NotImplementedError('%s cannot be checkpointed'
+                              % type(self).__name__)
+
+  def restore(self,state):
+    """
+    Makes the next run() from the time and state of state, as returned by
+    state(), continue the integration it was taken from.
+    """
+    raise NotImplementedError('%s cannot be checkpointed'
+                              % type(self).__name__)
+
+def rms(x):
+  """
+  Returns the root mean square of x, of its moduli for complex x, the
+  error norm of the adaptive integrators.
+  """
+  if numpy.iscomplexobj(x):
+    x = abs(x)
+  return numpy.sqrt((x**2).sum() / x.size)
+
+def register(cls):
+  """
+  Makes the integrator class cls available by its name to
+  ode_solvers.solve and to scipy's ode.  An earlier class of the same name
+  is kept.
+  """
+  integrators.setdefault(cls.__name__, cls)
+  if SCIPY_ODE in sys.modules or sys.version_info < (3, 4):
+    attach()
+  elif not any(isinstance(h, ScipyHook) for h in sys.meta_path):
+    sys.meta_path.insert(0, ScipyHook())
+  return cls
+
+def attach():
+  """
+  Appends the registered integrators to the classes scipy's ode searches,
+  importing it if need be.
+  """
+  try:
+    from scipy.integrate._ode import IntegratorBase
+  except ImportError:
+    return
+  for cls in integrators.values():
+    if cls not in IntegratorBase.integrator_classes:
+      IntegratorBase.integrator_classes.append(cls)
+
+class ScipyHook(object):
+  """
+  Import hook calling attach() once scipy.integrate._ode has been
+  imported, so that ode(f).set_integrator() finds the integrators without
+  ode_solvers importing scipy.integrate itself.
+  """
+
+  def find_spec(self, name, path, target=None):
+    if name != SCIPY_ODE:
+      return None
+    sys.meta_path.remove(self)
+    from importlib.util import find_spec
+    spec = find_spec(name)
+    if spec is not None and spec.loader is not None:
+      spec.loader = AttachLoader(spec.loader)
+    return spec
+
+class AttachLoader(object):
+  """
+  Loader running that of scipy.integrate._ode and then attach().
+  """
+
+  def __init__(self, loader):
+    self.loader = loader
+
+  def create_module(self, spec):
+    return self.loader.create_module(spec)
+
+  def exec_module(self, module):
+    self.loader.exec_module(module)
+    attach()
+
+def find(name):
+  """
+  Returns the integrator class registered as name.
+  """
+  try:
+    return integrators[name]
+  except KeyError:
+    raise ValueError('unknown integrator %r, choose one of %s'
+                     % (name, ', '.join(integrators)))
@@ -0,0 +1,85 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from scipy.sparse import csc_matrix, coo_matrix, dia_matrix, diags
+from numpy import zeros, ones, empty, arange, sqrt, maximum, finfo
+
+def band_pattern(n, lband, uband):
+  """
+  Returns the sparsity pattern of an n x n matrix with lband diagonals
+  below and uband diagonals above the main diagonal.
+  """
+  return diags([ones(n)]*(lband + uband + 1), range(-lband, uband + 1),
+               shape=(n,n), format='csc')
+
+def group_columns(S):
+  """
+  Partitions the columns of the sparsity pattern S into groups with no two
+  columns of a group sharing a nonzero row, so that every column of a
+  group can be differenced with the same call to the right-hand side.
+  Columns are taken greedily in order; for a banded pattern this gives the
+  optimal lband + uband + 1 groups.  Returns the group of every column.
+  """
+  S      = csc_matrix(S)
+  n      = S.shape[1]
+  groups = -ones(n, dtype=int)
+  g      = 0
+  while (groups < 0).any():
+    used = zeros(S.shape[0], dtype=bool)
+    for j in (groups < 0).nonzero()[0]:
+      rows = S.indices[S.indptr[j]:S.indptr[j+1]]
+      if not used[rows].any():
+        used[rows] = True
+        groups[j]  = g
+    g += 1
+  return groups
+
+def fd_jacobian(f, t, y, fy, f_params, S, groups):
+  """
+  Forward difference Jacobian of f at (t,y), with fy = f(t,y), for the
+  sparsity pattern S with columns grouped by group_columns().  Costs one
+  evaluation of f per group rather than per column.  Returns a sparse
+  matrix with the structure of S.
+  """
+  S    = coo_matrix(S)
+  h    = sqrt(finfo(float).eps) * maximum(1., abs(y))
+  ng   = groups.max() + 1
+  df   = empty((ng, y.size))
+  for g in range(ng):
+    yg = y.copy()
+    yg[groups == g] += h[groups == g]
+    df[g] = f(t, yg, *f_params) - fy
+  values = df[groups[S.col], S.row] / h[S.col]
+  return csc_matrix((values, (S.row, S.col)), shape=S.shape)
+
+def from_banded(ab, lband, uband):
+  """
+  Converts the banded storage ab[uband + i - j, j] = J[i,j] used for
+  banded Jacobians by scipy's ode to a sparse matrix.
+  """
+  n = ab.shape[1]
+  return dia_matrix((ab, uband - arange(lband + uband + 1)),
+                    shape=(n,n)).tocsc()
+
+def to_banded(M, lband, uband, extra=0):
+  """
+  Converts the sparse matrix M to banded storage with extra additional
+  rows on top, as required by LAPACK's gbtrf with extra = lband.
+  """
+  M  = csc_matrix(M).tocoo()
+  ab = zeros((extra + lband + uband + 1, M.shape[1]))
+  ab[extra + uband + M.row - M.col, M.col] = M.data
+  return ab
@@ -14,46 +14,66 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
-from scipy.integrate._ode import IntegratorBase
-from numpy import array,arange,isfinite,ceil
-from pylab import linspace
+from ode_solvers.Integrator import register
+from ode_solvers.FixedStep import FixedStep
+from ode_solvers.jit import jit_rhs, jit_loop
+from numpy import array, asarray, isfinite, multiply, add, float64
 
-class RungeKutta(IntegratorBase):
+class RungeKutta(FixedStep):
     runner = True
+    order  = 4
+    work   = 4
 
-    def __init__(self,dt=.01):
-        self.dt = dt
-
-    def reset(self,n,has_jac):
-        pass
+    def __init__(self,dt=.01,inplace=False,profile=False,callback=None,
+                 jit=None,events=None,checkpoint=None,rtol=None,atol=None,
+                 adaptive=False,dtype=None):
+     # jit selects the compiled loop of ode_solvers.jit, see jit_rhs().
+     FixedStep.__init__(self,dt,inplace,profile,callback,events,checkpoint,
+                        rtol,atol,adaptive,dtype)
+     self.jit = jit
 
     def run(self,f,jac,y0,t0,t1,f_params,jac_params):
-      # this method is called to integrate from t=t0 to t=t1
-      # with initial condition y0. f and jac are user-supplied functions
-      # that define the problem. f_params,jac_params are additional
-      # arguments to these functions.
+     fc = jit_rhs(f,self.jit)
+     if fc is None or self.inplace or self.callback is not None \
+        or self.events is not None or self.checkpoint is not None \
+        or self.adaptive or asarray(y0).ndim > 1 \
+        or self.state_type(y0) != float64:
+       return FixedStep.run(self,f,jac,y0,t0,t1,f_params,jac_params)
 
-     yo = array(y0) # Initial condition
-     t = t0
-     dt = self.dt
+     self.stats.start()
+     self.select(self.stats.rhs(f),y0,t0,t1,f_params)
+     yn,t,n,dt = jit_loop('rk4')(fc,array(y0,dtype=float),float(t0),
+                                 float(t1),float(self.dt),tuple(f_params))
+     self.stats.stop()
+     self.stats.add(4*n,n,0,dt,self.dt if n > 1 else dt,dt)
+     if isfinite(yn).all(): self.success = True # Check for success
+     return yn,t
 
-     while t < t1:
-     
-       # For last value of dt:
-       if t + dt > t1:
-         dt = t1 - t
-         
-       k1 = f(t, yo, *f_params) * dt
-       k2 = f(t + dt/2., yo + k1/2., *f_params) * dt
-       k3 = f(t + dt/2., yo + k2/2., *f_params) * dt
-       k4 = f(t + dt, yo + k3, *f_params) * dt
-       yn = yo.copy() + (1./6.) * (k1 + 2*k2 + 2*k3 + k4)
-       yo = yn.copy()
-       
-       t += dt
+    def step(self,f,t,y,fy,dt,f_params):
+     k1 = fy * dt
+     k2 = f(t + dt/2., y + k1/2., *f_params) * dt
+     k3 = f(t + dt/2., y + k2/2., *f_params) * dt
+     k4 = f(t + dt, y + k3, *f_params) * dt
+     return y + (1./6.) * (k1 + 2*k2 + 2*k3 + k4)
 
-     if isfinite(yn[-1]): self.success = 0 # Check for success
-     return yn,t
+    def step_into(self,f,t,y,fy,dt,f_params,out,w):
+     # here the k are derivatives, not yet multiplied by dt
+     k2, k3, k4, yt = w
+     multiply(fy, dt/2., out=yt)
+     yt += y
+     f(t + dt/2., yt, k2, *f_params)
+     multiply(k2, dt/2., out=yt)
+     yt += y
+     f(t + dt/2., yt, k3, *f_params)
+     multiply(k3, dt, out=yt)
+     yt += y
+     f(t + dt, yt, k4, *f_params)
+     add(k2, k3, out=yt)
+     yt *= 2
+     yt += fy
+     yt += k4
+     multiply(yt, dt/6., out=out)
+     out += y
 
 if RungeKutta.runner:
-    IntegratorBase.integrator_classes.append(RungeKutta)
+    register(RungeKutta)
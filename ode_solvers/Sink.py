@@ -0,0 +1,223 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Sinks streaming a trajectory to disk in fixed size batches, so that the
+memory used stays constant however long the run.  A sink takes the states
+one at a time through append(t,y), which can be given to an integrator as
+its callback to record every accepted step, or a block at a time through
+extend(), as Stepper.stream() does for output times.  The shape and dtype
+of the states are taken from the first one.
+
+NpySink and MemmapSink write .npy files of records with fields t and y,
+which load() maps back without copying.  HDF5Sink writes the datasets t and
+y of an HDF5 file, if h5py is installed.
+"""
+from numpy import asarray, empty, dtype, memmap
+import os
+
+HEADER = 128     # bytes reserved for the .npy header
+
+def record(y):
+  # dtype of the records holding a time and a state like y
+  y = asarray(y)
+  return dtype([('t', 'f8'), ('y', y.dtype, y.shape)])
+
+def write_header(f, rec, n):
+  # writes a version 1.0 .npy header for n records rec at the start of the
+  # open file f, padded to HEADER bytes so it can be rewritten in place.
+  from numpy.lib.format import dtype_to_descr
+  h = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" \
+      % (dtype_to_descr(rec), n)
+  h = h.ljust(HEADER - 10 - 1) + '\n'
+  if len(h) != HEADER - 10:
+    raise ValueError('state too complex for the .npy header')
+  f.seek(0)
+  f.write(b'\x93NUMPY\x01\x00' + bytearray([len(h) % 256, len(h) // 256])
+          + h.encode('latin1'))
+
+def load(filename):
+  """
+  Returns the times t and states y written to the .npy file filename by
+  an NpySink or MemmapSink, as read-only views of a memory map.
+  """
+  from numpy import load as load_npy
+  r = load_npy(filename, mmap_mode='r')
+  return r['t'], r['y']
+
+class Sink(object):
+  """
+  Base class of the sinks: buffers up to batch states and hands them to
+  write(k), which stores the first k records of the buffer, whenever the
+  buffer is full, and on flush() and close().  Sinks are context managers
+  closing themselves on exit.
+  """
+
+  def __init__(self, batch=4096):
+    self.batch = batch
+    self.n     = 0        # states written so far
+    self.k     = 0        # states in the buffer
+    self.buf   = None
+
+  def start(self, y):
+    # allocates the buffer for states like y before the first write
+    self.rec = record(y)
+    self.buf = empty(self.batch, self.rec)
+    self.bt  = self.buf['t']
+    self.by  = self.buf['y']
+    self.open()
+
+  def open(self):
+    pass
+
+  def write(self, k):
+    raise NotImplementedError
+
+  def append(self, t, y):
+    if self.buf is None:
+      self.start(y)
+    self.bt[self.k] = t
+    self.by[self.k] = y
+    self.k += 1
+    if self.k == self.batch:
+      self.flush()
+
+  def extend(self, t, y):
+    """
+    Appends the states y[i] at the times t[i].
+    """
+    if len(t) and self.buf is None:
+      self.start(y[0])
+    i = 0
+    while i < len(t):
+      m = min(self.batch - self.k, len(t) - i)
+      self.bt[self.k:self.k + m] = t[i:i + m]
+      self.by[self.k:self.k + m] = y[i:i + m]
+      self.k += m
+      i += m
+      if self.k == self.batch:
+        self.flush()
+
+  def flush(self):
+    if self.k:
+      self.write(self.k)
+      self.n += self.k
+      self.k  = 0
+
+  def close(self):
+    self.flush()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+class NpySink(Sink):
+  """
+  Appends the states to the .npy file filename, whose header is updated
+  with the number of records on every flush.
+  """
+
+  def __init__(self, filename, batch=4096):
+    Sink.__init__(self, batch)
+    self.filename = filename
+
+  def open(self):
+    self.f = open(self.filename, 'w+b')
+    write_header(self.f, self.rec, 0)
+
+  def write(self, k):
+    self.f.seek(0, os.SEEK_END)
+    self.f.write(self.buf[:k].tobytes())
+    write_header(self.f, self.rec, self.n + k)
+    self.f.flush()
+
+  def close(self):
+    Sink.close(self)
+    if self.buf is not None:
+      self.f.close()
+
+class MemmapSink(Sink):
+  """
+  Writes the states into a .npy file filename mapped in memory, grown by
+  capacity records at a time; the mapped records so far are array.
+  """
+
+  def __init__(self, filename, capacity=1 << 20, batch=4096):
+    Sink.__init__(self, batch)
+    self.filename = filename
+    self.capacity = capacity
+    self.array    = None
+
+  def open(self):
+    self.f = open(self.filename, 'w+b')
+    self.size = 0
+    write_header(self.f, self.rec, 0)
+
+  def write(self, k):
+    n = self.n + k
+    if n > self.size:
+      self.size = max(n, self.size + self.capacity)
+      self.f.truncate(HEADER + self.size * self.rec.itemsize)
+      self.f.flush()
+      self.map = memmap(self.f, self.rec, 'r+', HEADER, (self.size,))
+    self.map[self.n:n] = self.buf[:k]
+    self.array = self.map[:n]
+
+  def close(self):
+    Sink.close(self)
+    if self.buf is not None:
+      # drop the unused capacity and record the final length
+      self.map.flush()
+      self.array = self.map = None
+      self.f.truncate(HEADER + self.n * self.rec.itemsize)
+      write_header(self.f, self.rec, self.n)
+      self.f.close()
+
+class HDF5Sink(Sink):
+  """
+  Appends the states to the chunked, resizable datasets t and y of the group
+  path of the HDF5 file filename.
+  """
+
+  def __init__(self, filename, path='/', batch=4096):
+    Sink.__init__(self, batch)
+    self.filename = filename
+    self.path     = path
+
+  def open(self):
+    import h5py
+    self.f = h5py.File(self.filename, 'a')
+    g = self.f.require_group(self.path)
+    shape  = self.rec['y'].shape
+    self.t = g.create_dataset('t', (0,), 'f8', maxshape=(None,),
+                              chunks=(self.batch,))
+    self.y = g.create_dataset('y', (0,) + shape, self.rec['y'].base,
+                              maxshape=(None,) + shape,
+                              chunks=(self.batch,) + shape)
+
+  def write(self, k):
+    n = self.n + k
+    self.t.resize((n,))
+    self.y.resize((n,) + self.y.shape[1:])
+    self.t[self.n:n] = self.bt[:k]
+    self.y[self.n:n] = self.by[:k]
+
+  def close(self):
+    Sink.close(self)
+    if self.buf is not None:
+      self.f.close()
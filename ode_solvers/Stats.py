@@ -0,0 +1,135 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from numpy import inf, ndarray
+import time
+
+try:
+  clock = time.perf_counter
+except AttributeError:
+  clock = time.time
+
+# counters saved with the state of a run, see checkpoint
+COUNTERS = ('nfev', 'njev', 'naccept', 'nreject', 'dt_min', 'dt_max', 'time',
+            'time_rhs')
+
+class Stats(object):
+  """
+  Work done by an integrator since the last reset(), which scipy's ode
+  calls from set_initial_value():
+
+    nfev     evaluations of the right-hand side, including those for finite
+             difference Jacobians
+    njev     Jacobian evaluations
+    naccept  accepted steps (for ensembles, member steps)
+    nreject  rejected steps
+    dt_min, dt_max, dt_last
+             smallest, largest and last accepted step size
+    time     wall time spent in run()
+    time_rhs wall time spent in the right-hand side, only measured if
+             profile is set since timing every call has a cost
+    time_step
+             the remaining time, spent by the integrator itself
+  """
+
+  def __init__(self, profile=False):
+    self.profile = profile
+    self.reset()
+
+  def reset(self):
+    self.nfev     = 0
+    self.njev     = 0
+    self.naccept  = 0
+    self.nreject  = 0
+    self.dt_min   = inf
+    self.dt_max   = 0.
+    self.dt_last  = None
+    self.time     = 0.
+    self.time_rhs = 0.
+
+  @property
+  def time_step(self):
+    return self.time - self.time_rhs
+
+  def rhs(self, f):
+    """
+    Returns f wrapped to count its calls, and to time them if profile is
+    set.
+    """
+    if not self.profile:
+      def counted(*args):
+        self.nfev += 1
+        return f(*args)
+      return counted
+    def timed(*args):
+      self.nfev += 1
+      t0 = clock()
+      fy = f(*args)
+      self.time_rhs += clock() - t0
+      return fy
+    return timed
+
+  def accept(self, dt):
+    """
+    Records accepted steps of size dt, a number or an array of them.
+    """
+    if isinstance(dt, ndarray):
+      if dt.size == 0:
+        return
+      self.naccept += dt.size
+      lo, hi = dt.min(), dt.max()
+    else:
+      self.naccept += 1
+      lo = hi = dt
+    if lo < self.dt_min:
+      self.dt_min = lo
+    if hi > self.dt_max:
+      self.dt_max = hi
+    self.dt_last = dt
+
+  def add(self, nfev, naccept, nreject, dt_min, dt_max, dt_last):
+    """
+    Records the totals of a loop run outside of Python, see jit.
+    """
+    self.nfev    += nfev
+    self.naccept += naccept
+    self.nreject += nreject
+    if naccept:
+      self.dt_min  = min(self.dt_min, dt_min)
+      self.dt_max  = max(self.dt_max, dt_max)
+      self.dt_last = dt_last
+
+  def start(self):
+    self.t0 = clock()
+
+  def stop(self):
+    self.time += clock() - self.t0
+
+  def state(self):
+    """
+    Returns the counters as a dict of arrays for a checkpoint.
+    """
+    return dict(('stats_' + k, getattr(self, k)) for k in COUNTERS)
+
+  def restore(self, state):
+    for k in COUNTERS:
+      setattr(self, k, state['stats_' + k].item())
+
+  def __repr__(self):
+    return 'Stats(nfev=%d, njev=%d, naccept=%d, nreject=%d, dt_min=%g, ' \
+           'dt_max=%g, time=%g, time_rhs=%g)' \
+           % (self.nfev, self.njev, self.naccept, self.nreject, self.dt_min,
+              self.dt_max, self.time, self.time_rhs)
@@ -0,0 +1,147 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.FixedStep import FixedStep
+from numpy import array, asarray, empty, empty_like, multiply, isfinite, \
+                  searchsorted, cumsum, hstack, stack
+
+class Symplectic(FixedStep):
+    """
+    Splitting methods for separable Hamiltonian systems with positions q
+    and momenta p of any shape,
+
+      dq/dt = p / mass,   dp/dt = F(t,q),
+
+    such as N-body or molecular dynamics.  Every step is a sequence of
+    kicks p += kick[i]*dt*F and drifts q += drift[i]*dt*p/mass, which
+    preserves the symplectic structure, so the energy error stays bounded
+    instead of drifting over long runs.  The force at the end of a step is
+    reused by the next one, so a step costs one force evaluation per drift.
+
+    run_qp() works on q and p directly.  Through run(), the state y holds q
+    in y[...,0] and p in y[...,1], and the function given to the integrator
+    is the force F(t,q,*f_params), not the derivative of y.  If given,
+    callback(t,q,p) is called after every step.  The states are real.
+    """
+    runner  = False
+    uniform = True
+    dtype   = float
+    kick    = None    # len(drift) + 1 kick coefficients
+    drift   = None
+
+    def __init__(self,dt=.01,mass=1.,profile=False,callback=None,
+                 checkpoint=None):
+      FixedStep.__init__(self,dt,False,profile,callback,
+                         checkpoint=checkpoint)
+      self.mass = mass
+      # fraction of the step at which every kick is made
+      self.at = hstack((0., cumsum(self.drift)))
+
+    def run(self,f,jac,y0,t0,t1,f_params,jac_params):
+      y = array(self.as_state(y0))
+      y[...,0], y[...,1], t = self.run_qp(f,y[...,0],y[...,1],t0,t1,f_params)
+      if isfinite(y).all(): self.success = True
+      return y,t
+
+    def run_dense(self,f,jac,y0,t0,t_eval,f_params,jac_params,out=None):
+      # as FixedStep.run_dense(), from the Hermite interpolants of q and p.
+      t_eval = asarray(t_eval, dtype=float)
+      y = array(self.as_state(y0))
+      if out is None:
+        out = empty((len(t_eval),) + y.shape)
+      self.run_qp(f,y[...,0],y[...,1],t0,t_eval[-1],f_params,t_eval,out)
+      if isfinite(out[-1]).all(): self.success = True
+      return out
+
+    def run_qp(self,f,q,p,t0,t1,f_params=(),t_eval=None,out=None):
+      """
+      Integrates from the positions q and momenta p at t0 to t1 and
+      returns the new (q,p,t).  With t_eval, q and p at the increasing
+      times t_eval are written into out[...,0] and out[...,1]; the force
+      at both ends of a step is known, so this costs no extra evaluations.
+      """
+      st = self.stats
+      cp = self.checkpoint
+      st.start()
+      f  = st.rhs(f)
+      self.begin(t0)
+      q  = array(q, dtype=float)
+      p  = array(p, dtype=float)
+      minv  = 1. / asarray(self.mass, dtype=float)
+      w     = empty_like(p)
+      kick, drift, at = self.kick, self.drift, self.at
+      dense = t_eval is not None
+      if dense:
+        j = searchsorted(t_eval, t0, 'right')
+        out[:j,...,0] = q
+        out[:j,...,1] = p
+        shape = (-1,) + (1,)*q.ndim
+
+      F  = None   # the force at the current q, if known
+      tn = t0
+      for t, dt in self.grid(t0,t1):
+        if dense:
+          if F is None:
+            F = asarray(f(t,q,*f_params))
+          qo, po, Fo = q.copy(), p.copy(), F
+        for i in range(len(drift)):
+          if kick[i]:
+            if F is None:
+              F = asarray(f(t + at[i]*dt,q,*f_params))
+            multiply(F, kick[i]*dt, out=w)
+            p += w
+          multiply(p, drift[i]*dt, out=w)
+          w *= minv
+          q += w
+          F  = None
+        tn = t + dt
+        if kick[-1]:
+          F = asarray(f(tn,q,*f_params))
+          multiply(F, kick[-1]*dt, out=w)
+          p += w
+        st.accept(dt)
+
+        if dense:
+          k = searchsorted(t_eval, tn, 'right')
+          if k > j:
+            if F is None:
+              F = asarray(f(tn,q,*f_params))
+            theta = ((t_eval[j:k] - t)/dt).reshape(shape)
+            out[j:k,...,0] = self.interpolate(theta,dt,qo,po*minv,q,p*minv)
+            out[j:k,...,1] = self.interpolate(theta,dt,po,Fo,p,F)
+            if t_eval[k-1] == tn:
+              out[k-1,...,0] = q
+              out[k-1,...,1] = p
+            j = k
+        if self.callback is not None:
+          self.callback(tn,q,p)
+        if cp is not None and cp.due():
+          cp.save(self.state(tn,stack((q,p),axis=-1)))
+
+      if dense:
+        out[j:,...,0] = q
+        out[j:,...,1] = p
+      self.origin = None
+      st.stop()
+      return q,p,tn
+
+def composition(weights):
+    # kick and drift coefficients of the composition of velocity Verlet
+    # steps of the given relative sizes; the half kicks between them merge.
+    w = list(weights)
+    kick = [w[0]/2.] + [(a + b)/2. for a, b in zip(w[:-1], w[1:])] \
+           + [w[-1]/2.]
+    return array(kick), array(w)
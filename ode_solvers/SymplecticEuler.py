@@ -0,0 +1,32 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import register
+from ode_solvers.Symplectic import Symplectic
+from numpy import array
+
+class SymplecticEuler(Symplectic):
+    """
+    First order symplectic Euler method: a kick with the force at the start
+    of the step, then a drift with the new momenta, as EulerCromer does for
+    a single [x,v] state.  One force evaluation per step.
+    """
+    runner = True
+    kick   = array([1., 0.])
+    drift  = array([1.])
+
+if SymplecticEuler.runner:
+    register(SymplecticEuler)
@@ -0,0 +1,30 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import register
+from ode_solvers.EmbeddedRungeKutta import EmbeddedRungeKutta
+from ode_solvers.ButcherTableau import Tsitouras
+
+class Tsitouras45(EmbeddedRungeKutta):
+    """
+    Tsitouras 5(4) pair, see EmbeddedRungeKutta: the cost of RungeKutta45
+    per step, with a smaller error for the same step.
+    """
+    runner  = True
+    tableau = Tsitouras
+
+if Tsitouras45.runner:
+    register(Tsitouras45)
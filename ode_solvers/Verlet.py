@@ -0,0 +1,29 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import register
+from ode_solvers.Symplectic import Symplectic, composition
+
+class Verlet(Symplectic):
+    """
+    Second order velocity Verlet (leapfrog) method: half kick, drift, half
+    kick.  One force evaluation per step.
+    """
+    runner = True
+    kick, drift = composition([1.])
+
+if Verlet.runner:
+    register(Verlet)
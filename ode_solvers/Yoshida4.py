@@ -0,0 +1,34 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import register
+from ode_solvers.Symplectic import Symplectic, composition
+
+# Yoshida, 'Construction of higher order symplectic integrators', Phys. Lett.
+# A 150 (1990): the triple jump of Verlet steps.
+w1 = 1. / (2. - 2.**(1./3))
+w0 = 1. - 2.*w1
+
+class Yoshida4(Symplectic):
+    """
+    Fourth order composition of three Verlet steps.  Three force
+    evaluations per step.
+    """
+    runner = True
+    kick, drift = composition([w1, w0, w1])
+
+if Yoshida4.runner:
+    register(Yoshida4)
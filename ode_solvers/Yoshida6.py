@@ -0,0 +1,36 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import register
+from ode_solvers.Symplectic import Symplectic, composition
+
+# Yoshida, 'Construction of higher order symplectic integrators', Phys. Lett.
+# A 150 (1990), solution A of the sixth order composition of Verlet steps.
+w1 = -1.17767998417887
+w2 =  0.235573213359357
+w3 =  0.784513610477560
+w0 =  1. - 2.*(w1 + w2 + w3)
+
+class Yoshida6(Symplectic):
+    """
+    Sixth order composition of seven Verlet steps.  Seven force evaluations
+    per step.
+    """
+    runner = True
+    kick, drift = composition([w3, w2, w1, w0, w1, w2, w3])
+
+if Yoshida6.runner:
+    register(Yoshida6)
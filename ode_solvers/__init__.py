@@ -4,31 +4,61 @@ __license__    = 'LGPL-3'
 __maintainer__ = 'Evan M. Cummings'
 __email__      = 'evan.cummings@aalto.fi'
 
-__all__ = []
+# Importing the package registers its integrators, see Integrator.register(),
+# in the order they are searched by scipy's ode.set_integrator(), which takes
+# the first class whose name starts with the one asked for.  The package
+# pulls in numpy and scipy only; matplotlib is left alone, see
+# plotting.use_style(), and scipy's ode is extended once it is imported.
+from ode_solvers.Integrator      import Integrator, integrators, register
+from ode_solvers.Adams           import Adams
+from ode_solvers.BDF             import BDF
+from ode_solvers.BulirschStoer   import BulirschStoer
+from ode_solvers.DormandPrince853 import DormandPrince853
+from ode_solvers.ETDRK4          import ETDRK4
+from ode_solvers.Euler           import Euler
+from ode_solvers.EulerCromer     import EulerCromer
+from ode_solvers.EulerRichardson import EulerRichardson
+from ode_solvers.ExponentialEuler import ExponentialEuler
+from ode_solvers.Predictor       import Predictor
+from ode_solvers.RungeKutta      import RungeKutta
+from ode_solvers.RungeKutta45    import RungeKutta45
+from ode_solvers.SymplecticEuler import SymplecticEuler
+from ode_solvers.Tsitouras45     import Tsitouras45
+from ode_solvers.Verlet          import Verlet
+from ode_solvers.Yoshida4        import Yoshida4
+from ode_solvers.Yoshida6        import Yoshida6
+from ode_solvers.ButcherTableau  import ButcherTableau
+from ode_solvers.Stats           import Stats
+from ode_solvers.Sink            import Sink, NpySink, MemmapSink, HDF5Sink
+from ode_solvers.solve           import solve, Stepper, Solution
+from ode_solvers.cache           import RHSCache
+from ode_solvers.checkpoint      import Checkpoint
+from ode_solvers.trajectory      import trajectory
 
-import pkgutil
-import inspect
-import matplotlib as mpl
-#mpl.use('Agg')
-mpl.rcParams['font.family']          = 'serif'
-mpl.rcParams['legend.fontsize']      = 'medium'
-mpl.rcParams['text.usetex']          = True
-mpl.rcParams['text.latex.preamble']  = ['\usepackage{fouriernc}',
-                                        '\usepackage[mathscr]{euscript}']
-#mpl.rcParams['contour.negative_linestyle']   = 'solid'
+__all__ = list(integrators) + ['Integrator', 'register', 'ButcherTableau',
+                               'Stats', 'Sink', 'NpySink', 'MemmapSink',
+                               'HDF5Sink', 'solve', 'Stepper', 'Solution',
+                               'RHSCache', 'Checkpoint', 'trajectory',
+                               'sweep']
 
-for loader, name, is_pkg in pkgutil.walk_packages(__path__):
-  module = loader.find_module(name).load_module(name)
-  for name, value in inspect.getmembers(module):
-    if name.startswith('__'):
-      continue
+# solve_async() is written with async/await.  It and sweep() pull in
+# asyncio and multiprocessing, so where modules can have a __getattr__ they
+# are imported when first used.
+import sys
+lazy = {'sweep': 'ode_solvers.sweep'}
+if sys.version_info >= (3, 5):
+    lazy['solve_async'] = 'ode_solvers.aio'
+    __all__.append('solve_async')
 
-    globals()[name] = value
-    __all__.append(name)
-
-from EulerCromer     import *
-from EulerRichardson import *
-from Predictor       import *
-from RungeKutta45x   import *
-from Euler           import *
-from RungeKutta45    import *
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name not in lazy:
+            raise AttributeError('module %r has no attribute %r'
+                                 % (__name__, name))
+        from importlib import import_module
+        value = globals()[name] = getattr(import_module(lazy[name]), name)
+        return value
+else:
+    from ode_solvers.sweep import sweep
+    if 'solve_async' in lazy:
+        from ode_solvers.aio import solve_async
@@ -0,0 +1,109 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Integration from asyncio code, for services that must not block their event
+loop on a long run.  solve_async() integrates in an executor, a segment of
+about so many steps at a time, and returns to the event loop between
+segments, where the task can be cancelled and progress is reported.  It
+needs Python 3.5 or later; the package imports it only there.
+"""
+from ode_solvers.solve import Stepper, Solution
+from numpy import asarray, empty, searchsorted, amin, append
+import asyncio
+import inspect
+
+def _segment(s, t_eval, j, steps):
+  # advances the Stepper s by about steps steps, filling the output times
+  # from t_eval[j] on that it passes, and returns s, their states and the
+  # index of the next output time.
+  # the size of the next step, not that of the last one, which may have
+  # been cut short to end the previous segment
+  h  = s.integrator.step_size(s.f, s.t, s.y, s.args)
+  te = s.t + steps * amin(h)
+  if te < t_eval[j]:
+    # no output time in reach: end the segment at te, recording nothing
+    s.advance(te)
+    return s, empty((0,) + s.y.shape, dtype=s.y.dtype), j
+  k  = searchsorted(t_eval, te, 'right')
+  t  = t_eval[j:k]
+  if k < len(t_eval) and te > t[-1]:
+    # end the segment at te, between two output times
+    t = append(t, te)
+  return s, s.dense(t)[:k - j], k
+
+async def solve_async(f, t_span, y0, method='RungeKutta45', t_eval=None,
+                      args=(), jac=None, jac_args=(), steps=1000,
+                      executor=None, limiter=None, progress=None, **options):
+  """
+  As solve(), but a coroutine integrating in executor, a
+  concurrent.futures executor or by default the event loop's, a segment
+  of about steps steps at a time.  Between segments it returns to the event
+  loop: cancelling the task stops the integration at the end of the
+  current segment, and if given, progress(t,y) is called, or awaited if it
+  is a coroutine function, with the time and state reached.
+
+  f may be a coroutine function, for models that await I/O; it is then run
+  on the event loop, while the integrator waits in its thread, and the
+  executor must not be a process pool.  With a process pool the integrator
+  goes back and forth between the processes with every segment, so f must
+  be picklable, i.e. defined at module level.
+
+  limiter, an asyncio.Semaphore shared by the calls, bounds the number of
+  integrations in flight: the others wait for it before starting.
+  """
+  if limiter is not None:
+    async with limiter:
+      return await solve_async(f, t_span, y0, method, t_eval, args, jac,
+                               jac_args, steps, executor, None, progress,
+                               **options)
+
+  try:
+    loop = asyncio.get_running_loop()
+  except AttributeError:
+    # Python 3.5 and 3.6
+    loop = asyncio.get_event_loop()
+  if inspect.iscoroutinefunction(f):
+    from concurrent.futures import ProcessPoolExecutor
+    if isinstance(executor, ProcessPoolExecutor):
+      raise ValueError('a coroutine function f needs a thread executor')
+    fa = f
+    f  = lambda t, y, *a: \
+           asyncio.run_coroutine_threadsafe(fa(t, y, *a), loop).result()
+
+  t0, t1 = t_span
+  s = Stepper(f, t0, y0, method, args, jac, jac_args, **options)
+  t_eval = asarray([t0, t1] if t_eval is None else t_eval, dtype=float)
+  y = empty((len(t_eval),) + s.y.shape, dtype=s.y.dtype)
+  j = searchsorted(t_eval, t0, 'right')
+  y[:j] = s.y
+
+  while j < len(t_eval):
+    s, yj, k = await loop.run_in_executor(executor, _segment, s, t_eval, j,
+                                          steps)
+    y[j:j + len(yj)] = yj
+    if progress is not None:
+      done = progress(s.t, s.y)
+      if inspect.isawaitable(done):
+        await done
+    if getattr(s.integrator, 'terminated', None) is not None:
+      y = y[:j + len(yj)]
+      break
+    j = k
+
+  stop = getattr(s.integrator, 'terminated', None)
+  return Solution(t_eval[:len(y)], y, s.success, s.stats,
+                  getattr(s.integrator, 'events', None), stop is not None)
@@ -0,0 +1,328 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Work-precision benchmark of the integrators of this package.
+
+Every integrator is run through ode_solvers.solve.Stepper on a set of standard
+problems at a range of step sizes (fixed-step methods) or tolerances
+(adaptive methods), recording the wall time, the number of right-hand side
+evaluations, the number of rejected steps where the integrator reports it,
+and the mixed absolute-relative error against a reference solution at the
+final time.  Runs headless:
+
+  python -m ode_solvers.benchmark --json bench.json --csv bench.csv
+  python -m ode_solvers.benchmark --baseline bench.json
+
+The second form exits with status 1 if any run is slower, takes more
+evaluations or is less accurate than recorded in the baseline.
+"""
+from scipy.integrate import solve_ivp
+from ode_solvers.Integrator import find
+from ode_solvers.FixedStep import FixedStep
+from ode_solvers.solve import Stepper
+from scipy.special import erf
+from numpy import array, zeros, zeros_like, sqrt, exp, cos, sin, abs
+import inspect
+import json
+import time
+import sys
+
+try:
+  clock = time.perf_counter
+except AttributeError:
+  clock = time.time
+
+
+#===============================================================================
+# problems
+
+def sho(t, y, k, m):
+  return array([y[1], -k/m*y[0]])
+
+def sho_force(t, q, k, m):
+  return -k/m*q
+
+def nugf(t, y, M, m, G, R):
+  F = -(G*M*m)/(R + y[0])**2
+  return array([y[1], F/m])
+
+def nugf_force(t, q, M, m, G, R):
+  return -(G*M)/(R + q)**2
+
+def erf_rhs(t, y):
+  return array([2/sqrt(3.141592653589793) * exp(-t**2)])
+
+def vdp(t, y, mu):
+  return array([y[1], mu*(1 - y[0]**2)*y[1] - y[0]])
+
+# the nonlinear parts N of the problems written as y' = A y + N(t,y), for
+# the exponential integrators
+
+def sho_linear(k, m):
+  return array([[0., 1.], [-k/m, 0.]])
+
+def sho_nonlinear(t, y, k, m):
+  return zeros_like(y)
+
+def nugf_linear(M, m, G, R):
+  return array([[0., 1.], [0., 0.]])
+
+def nugf_nonlinear(t, y, M, m, G, R):
+  return array([0., -(G*M)/(R + y[0])**2])
+
+def erf_linear():
+  return zeros((1, 1))
+
+def vdp_linear(mu):
+  return array([[0., 1.], [-1., 0.]])
+
+def vdp_nonlinear(t, y, mu):
+  return array([0., mu*(1 - y[0]**2)*y[1]])
+
+def rober(t, y, k1, k2, k3):
+  return array([-k1*y[0] + k3*y[1]*y[2],
+                 k1*y[0] - k2*y[1]**2 - k3*y[1]*y[2],
+                 k2*y[1]**2])
+
+def reference(f, y0, t1, params):
+  # tight tolerance solution of scipy at t1
+  s = solve_ivp(lambda t, y: f(t, y, *params), (0., t1), y0,
+                method='Radau', rtol=1e-12, atol=1e-14)
+  return s.y[:,-1]
+
+class Problem(object):
+  """
+  Initial value problem f(t,y,*params) with y(0) = y0 on [0,t1]; exact is a
+  function returning the solution at t1, evaluated once by solution().
+  Stiff problems are only run with the implicit integrators, and only
+  second order problems with state [x,v] with the integrators that assume
+  that form.  The symplectic integrators are run on the problems with a
+  force(t,x,*params), the acceleration, for which v is the momentum, and
+  the exponential integrators on those with a linear(*params) part A and
+  a nonlinear one(t,y,*params) N such that f = A y + N.
+  """
+  def __init__(self, name, f, y0, t1, params, exact, stiff=False,
+               second_order=False, force=None, linear=None, nonlinear=None):
+    self.name   = name
+    self.f      = f
+    self.y0     = array(y0, dtype=float)
+    self.t1     = t1
+    self.params = params
+    self.exact  = exact
+    self.stiff  = stiff
+    self.second_order = second_order
+    self.force  = force
+    self.linear    = linear
+    self.nonlinear = nonlinear
+    self.y1     = None
+
+  def solution(self):
+    if self.y1 is None:
+      self.y1 = self.exact()
+    return self.y1
+
+problems = [
+  Problem('sho', sho, [1., 0.], 20., (1., 9.),
+          lambda: array([cos(20./3), -sin(20./3)/3]), second_order=True,
+          force=sho_force, linear=sho_linear, nonlinear=sho_nonlinear),
+  Problem('fall', nugf, [50., 0.], 3., (5.9722e24, 1., 6.67384e-11, 6.37e6),
+          lambda: reference(nugf, [50., 0.], 3.,
+                            (5.9722e24, 1., 6.67384e-11, 6.37e6)),
+          second_order=True, force=nugf_force, linear=nugf_linear,
+          nonlinear=nugf_nonlinear),
+  Problem('erf', erf_rhs, [0.], 1., (),
+          lambda: array([erf(1.)]), linear=erf_linear, nonlinear=erf_rhs),
+  Problem('vanderpol', vdp, [2., 0.], 10., (1.,),
+          lambda: reference(vdp, [2., 0.], 10., (1.,)), second_order=True,
+          linear=vdp_linear, nonlinear=vdp_nonlinear),
+  Problem('robertson', rober, [1., 0., 0.], 40., (0.04, 3e7, 1e4),
+          lambda: reference(rober, [1., 0., 0.], 40., (0.04, 3e7, 1e4)),
+          stiff=True),
+]
+
+# step sizes of the fixed-step and tolerances of the adaptive integrators
+dts   = [0.1, 0.05, 0.02, 0.01, 0.005]
+rtols = [1e-3, 1e-5, 1e-7, 1e-9]
+stiff        = ['BDF']
+second_order = ['EulerCromer', 'Predictor']
+symplectic   = ['SymplecticEuler', 'Verlet', 'Yoshida4', 'Yoshida6']
+exponential  = ['ExponentialEuler', 'ETDRK4']
+
+
+#===============================================================================
+# runs
+
+def integrators():
+  """
+  Returns the names of the integrators of the package, in registration
+  order.
+  """
+  import ode_solvers
+  return list(ode_solvers.integrators)
+
+def settings(name):
+  """
+  Returns the list of option dictionaries to run the integrator name with:
+  a sweep of step sizes for the fixed-step methods, even those that can
+  choose their step from rtol, and of tolerances for the others.
+  """
+  cls  = find(name)
+  if issubclass(cls, FixedStep):
+    return [{'dt' : dt} for dt in dts]
+  try:
+    args = inspect.getfullargspec(cls.__init__).args
+  except AttributeError:
+    args = inspect.getargspec(cls.__init__).args
+  if 'rtol' in args:
+    return [{'rtol' : r, 'atol' : r*1e-3} for r in rtols]
+  return [{'dt' : dt} for dt in dts]
+
+def measure(problem, name, options, repeat=1):
+  """
+  Integrates problem with the integrator name and options, and returns a
+  dictionary of the results of the fastest of repeat runs.
+  """
+  rhs  = problem.force if name in symplectic else problem.f
+  extra = {}
+  if name in exponential:
+    rhs   = problem.nonlinear
+    extra = {'A' : problem.linear(*problem.params)}
+  best = None
+  for i in range(repeat):
+    nfev = [0]
+    def f(t, y, *params):
+      nfev[0] += 1
+      return rhs(t, y, *params)
+
+    r  = Stepper(f, 0., problem.y0, name, problem.params,
+                 **dict(options, **extra))
+    t0 = clock()
+    r.advance(problem.t1)
+    wall = clock() - t0
+    if best is None or wall < best['time']:
+      stats = r.stats
+      best  = {'problem'    : problem.name,
+               'integrator' : name,
+               'options'    : options,
+               'time'       : wall,
+               'nfev'       : nfev[0],
+               'nreject'    : getattr(stats, 'nreject', None),
+               'success'    : r.success,
+               'y'          : r.y}
+  exact = problem.solution()
+  err   = abs(best.pop('y') - exact) / (1. + abs(exact))
+  best['error'] = float(err.max())
+  return best
+
+def run(names=None, problem_names=None, repeat=1):
+  """
+  Runs the benchmark for the integrators names and problems problem_names,
+  by default all of them, and returns the list of results.
+  """
+  results = []
+  for problem in problems:
+    if problem_names and problem.name not in problem_names:
+      continue
+    for name in names or integrators():
+      if problem.stiff and name not in stiff:
+        continue
+      if not problem.second_order and name in second_order:
+        continue
+      if problem.force is None and name in symplectic:
+        continue
+      if problem.linear is None and name in exponential:
+        continue
+      for options in settings(name):
+        results.append(measure(problem, name, options, repeat))
+  return results
+
+
+#===============================================================================
+# output
+
+def key(result):
+  options = ','.join('%s=%g' % kv for kv in sorted(result['options'].items()))
+  return '%s/%s/%s' % (result['problem'], result['integrator'], options)
+
+def write_json(results, filename):
+  with open(filename, 'w') as f:
+    json.dump(results, f, indent=1, sort_keys=True)
+
+def write_csv(results, filename):
+  cols = ['problem', 'integrator', 'options', 'time', 'nfev', 'nreject',
+          'error', 'success']
+  with open(filename, 'w') as f:
+    f.write(','.join(cols) + '\n')
+    for r in results:
+      row = dict(r, options=key(r).split('/')[-1].replace(',', ' '))
+      f.write(','.join(str(row[c]) for c in cols) + '\n')
+
+def regressions(results, baseline, time_tol=0.5, time_floor=5e-3,
+                error_tol=10.):
+  """
+  Compares results to the baseline results, and returns a description of
+  every run that takes more than 1 + time_tol times the time plus
+  time_floor seconds, more evaluations, or has more than error_tol times
+  the error of its baseline.
+  """
+  base  = dict((key(r), r) for r in baseline)
+  found = []
+  for r in results:
+    b = base.get(key(r))
+    if b is None:
+      continue
+    if r['time'] > (1 + time_tol) * b['time'] + time_floor:
+      found.append('%s: time %.3g s, baseline %.3g s' \
+                   % (key(r), r['time'], b['time']))
+    if r['nfev'] > b['nfev']:
+      found.append('%s: %d evaluations, baseline %d' \
+                   % (key(r), r['nfev'], b['nfev']))
+    if r['error'] > error_tol * b['error'] + 1e-15:
+      found.append('%s: error %.3g, baseline %.3g' \
+                   % (key(r), r['error'], b['error']))
+  return found
+
+def main(argv=None):
+  import argparse
+  parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+  parser.add_argument('--json', help='write the results to this JSON file')
+  parser.add_argument('--csv', help='write the results to this CSV file')
+  parser.add_argument('--baseline', help='JSON results to compare against')
+  parser.add_argument('--integrators', nargs='+', help='integrators to run')
+  parser.add_argument('--problems', nargs='+', help='problems to run')
+  parser.add_argument('--repeat', type=int, default=3,
+                      help='runs of which the fastest is kept')
+  args = parser.parse_args(argv)
+
+  results = run(args.integrators, args.problems, args.repeat)
+  for r in results:
+    print('%-45s %9.4f s %7d fev  err %.2e' \
+          % (key(r), r['time'], r['nfev'], r['error']))
+  if args.json:
+    write_json(results, args.json)
+  if args.csv:
+    write_csv(results, args.csv)
+  if args.baseline:
+    with open(args.baseline) as f:
+      found = regressions(results, json.load(f))
+    for line in found:
+      print('REGRESSION ' + line)
+    return 1 if found else 0
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,129 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Memoization of an expensive right-hand side.  scipy's ode restarts
+RungeKutta45 from the end of the previous interval at every integrate()
+call, evaluating f there again: about one call in 25 for 100 output
+intervals of van der Pol.  The other integrators keep their derivatives
+from run to run and repeat only an evaluation or two at the initial value.
+When a call of f costs milliseconds, remembering its last few results
+pays.
+"""
+from collections import OrderedDict
+from numpy import array, asarray, array_equal, ndarray, copyto
+
+class RHSCache(object):
+  """
+  Wraps the right-hand side f(t,y,*args) in a bounded least recently used
+  cache of its last size results, keyed on t, the arguments and the state.
+  With key='hash' the state, and t when it is an array as for the
+  ensembles of RungeKutta45, are hashed by value and checked on a hit,
+  which is safe whatever the integrator does with its buffers.  With
+  key='identity' the state is keyed on the array object itself, which
+  costs nothing for a large state but is only right for integrators that
+  never write into a state they have passed to f, i.e. not inplace ones,
+  and only hits when they pass the same array again, which scipy's ode,
+  copying the state of every call, does not.
+
+  With inplace set, f is the in-place right-hand side f(t,y,out,*args) of
+  the integrators' inplace option, and a hit copies the cached derivative
+  into out.  An f returning None is taken for an in-place one used without
+  it, and rejected.
+
+  The results are returned read-only, as they are shared by the calls that
+  hit them.  hits and misses count the calls answered from the cache and
+  by f.
+  """
+
+  def __init__(self, f, size=16, key='hash', inplace=False):
+    if key not in ('hash', 'identity'):
+      raise ValueError("key must be 'hash' or 'identity', not %r" % (key,))
+    if inplace and key == 'identity':
+      raise ValueError("in-place integrators write into their states, "
+                       "which key='identity' cannot see")
+    self.f        = f
+    self.size     = size
+    self.identity = key == 'identity'
+    self.inplace  = inplace
+    self.entries  = OrderedDict()
+    self.hits     = 0
+    self.misses   = 0
+
+  def clear(self):
+    self.entries.clear()
+    self.hits   = 0
+    self.misses = 0
+
+  def key(self, t, y, args):
+    try:
+      hash(args)
+    except TypeError:
+      args = tuple(id(a) for a in args)
+    if isinstance(t, ndarray):
+      t = (t.shape, hash(t.tobytes()))
+    if self.identity:
+      return (t, id(y), args)
+    return (t, y.shape, y.dtype.str, hash(y.tobytes()), args)
+
+  def lookup(self, t, y, args):
+    # the cached derivative at (t,y,args), or None
+    key   = self.key(t, y, args)
+    entry = self.entries.pop(key, None)
+    if entry is None:
+      return key, None
+    if not self.identity and not (array_equal(entry[0], t) and
+                                  array_equal(entry[1], y)):
+      # a collision of the hashes
+      return key, None
+    self.entries[key] = entry
+    self.hits += 1
+    return key, entry[2]
+
+  def store(self, key, t, y, fy):
+    fy = array(fy)
+    fy.flags.writeable = False
+    # the identity key keeps y alive, so its id is not reused
+    self.entries[key] = (t if self.identity else array(t),
+                         y if self.identity else y.copy(), fy)
+    if len(self.entries) > self.size:
+      self.entries.popitem(last=False)
+    self.misses += 1
+    return fy
+
+  def __call__(self, t, y, *args):
+    y = asarray(y)
+    if self.inplace:
+      out, args = args[0], args[1:]
+    key, fy = self.lookup(t, y, args)
+    if self.inplace:
+      if fy is not None:
+        copyto(out, fy)
+        return out
+      self.f(t, y, out, *args)
+      self.store(key, t, y, out)
+      return out
+    if fy is not None:
+      return fy
+    fy = self.f(t, y, *args)
+    if fy is None:
+      raise TypeError('f returned None: an in-place right-hand side needs '
+                      'RHSCache(f, inplace=True)')
+    return self.store(key, t, y, fy)
+
+  def __repr__(self):
+    return 'RHSCache(size=%d, hits=%d, misses=%d)' \
+           % (self.size, self.hits, self.misses)
@@ -0,0 +1,83 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Checkpoints of integrations in progress, so that a long run that dies can
+be resumed where it stopped instead of from its initial value.  The state
+of a run is the dict of arrays returned by an integrator's state(): the
+time and state reached, whatever the method carries from step to step (the
+FSAL stages and next step size of RungeKutta45, the previous state of
+Predictor, the grid of the uniform fixed-step methods) and the counters of
+its Stats.  It is written to an uncompressed .npz file, which holds the
+arrays in their binary form, so the resumed run continues bit for bit.
+
+An integrator given a Checkpoint saves its state during runs, every so many
+accepted steps or seconds; Stepper.save() saves it between runs, and
+Stepper.restore() resumes from either.
+"""
+from ode_solvers.Stats import clock
+from numpy import savez, load as load_npz
+import os
+
+def save(filename, state):
+  """
+  Writes the dict of arrays state to the .npz file filename.  The file is
+  written aside and then renamed, so a run dying in the middle of a save
+  leaves the previous checkpoint intact.
+  """
+  tmp = filename + '.tmp'
+  with open(tmp, 'wb') as f:
+    savez(f, **state)
+    f.flush()
+    os.fsync(f.fileno())
+  getattr(os, 'replace', os.rename)(tmp, filename)
+
+def load(filename):
+  """
+  Returns the dict of arrays saved to filename by save().
+  """
+  with load_npz(filename) as z:
+    return dict((k, z[k]) for k in z.files)
+
+class Checkpoint(object):
+  """
+  Given as the checkpoint option of an integrator, saves the state of its
+  runs to filename after every steps accepted steps and every seconds of
+  wall time, whichever comes first; either may be None.
+  """
+
+  def __init__(self, filename, steps=None, seconds=None):
+    self.filename = filename
+    self.steps    = steps
+    self.seconds  = seconds
+    self.saved    = 0        # number of checkpoints written
+    self.count    = 0
+    self.last     = clock()
+
+  def due(self):
+    """
+    Called after every accepted step, returns whether to save one.
+    """
+    self.count += 1
+    if self.steps is not None and self.count >= self.steps:
+      return True
+    return self.seconds is not None and clock() - self.last >= self.seconds
+
+  def save(self, state):
+    save(self.filename, state)
+    self.saved += 1
+    self.count  = 0
+    self.last   = clock()
@@ -0,0 +1,105 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from numpy import array, finfo
+
+def illinois(g, a, b, ga, gb, maxiter=100):
+  """
+  Returns a point within rounding of a zero of g between a and b, where
+  g(a) = ga and g(b) = gb have opposite signs, found by the Illinois
+  variant of regula falsi.  The point is on the side of b, so g there has
+  the sign of gb, or is zero.
+  """
+  xtol = 4 * finfo(float).eps * max(abs(a), abs(b))
+  side = 0
+  for i in range(maxiter):
+    if abs(b - a) <= xtol:
+      break
+    c  = (a*gb - b*ga) / (gb - ga)
+    gc = g(c)
+    if gc == 0:
+      return c
+    if (gc > 0) == (gb > 0):
+      b, gb = c, gc
+      if side == -1:
+        ga /= 2.
+      side = -1
+    else:
+      a, ga = c, gc
+      if side == 1:
+        gb /= 2.
+      side = 1
+  return b
+
+class Events(object):
+  """
+  Event functions g(t,y,*f_params) whose zeros are located on the
+  interpolant of every accepted step, at no cost in evaluations of f.  As
+  for scipy's solve_ivp, an event function with the attribute terminal set
+  stops the integration at its first zero, and one with the attribute
+  direction only counts zeros where g increases (direction > 0) or
+  decreases (direction < 0).  t_events[i] and y_events[i] list the zeros of
+  events[i] found since the last reset().
+  """
+
+  def __init__(self, events):
+    if callable(events):
+      events = [events]
+    self.events    = list(events)
+    self.terminal  = [getattr(g, 'terminal', False) for g in self.events]
+    self.direction = [getattr(g, 'direction', 0) for g in self.events]
+    self.reset()
+
+  def reset(self):
+    self.t_events = [[] for g in self.events]
+    self.y_events = [[] for g in self.events]
+
+  def start(self, t, y, f_params):
+    self.f_params = f_params
+    self.g = [g(t, y, *f_params) for g in self.events]
+
+  def check(self, t, tn, yn, interp):
+    """
+    Looks for zeros of the events in the step from t to tn ending at the
+    state yn, where interp(s) is the state at time s, and returns the time
+    and state of the first terminal one, or None.
+    """
+    p  = self.f_params
+    gn = [g(tn, yn, *p) for g in self.events]
+    found = []
+    for i, g in enumerate(self.events):
+      go, gi = self.g[i], gn[i]
+      if go == 0 or (go > 0) == (gi > 0) and gi != 0:
+        continue
+      if self.direction[i] * (gi - go) < 0:
+        continue
+      if gi == 0:
+        te = tn
+      else:
+        te = illinois(lambda s: g(s, interp(s), *p), t, tn, go, gi)
+      found.append((te, i))
+    self.g = gn
+
+    stop = None
+    for te, i in sorted(found):
+      if stop is not None and te > stop[0]:
+        break
+      ye = array(yn) if te == tn else interp(te)
+      self.t_events[i].append(te)
+      self.y_events[i].append(ye)
+      if self.terminal[i] and stop is None:
+        stop = (te, ye)
+    return stop
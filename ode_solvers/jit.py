@@ -0,0 +1,139 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Optional numba backend.  The stepping loops below are plain Python
+functions; when numba is installed and the right-hand side is compiled,
+jit_loop() compiles them in nopython mode so a whole run executes without
+a Python call per stage.  Nothing here imports numba until it is needed.
+"""
+from math import sqrt
+
+_jitted = {}
+_loops  = {}
+
+def jit_rhs(f, jit=None):
+  """
+  Returns the compiled version of the right-hand side f, or None if the
+  compiled loops cannot or should not be used.  With jit None, f is used
+  only if the user has already compiled it with numba; with jit True, f is
+  compiled here if necessary; with jit False the backend is disabled.
+  """
+  if jit is False:
+    return None
+  try:
+    from numba import njit
+    from numba.extending import is_jitted
+  except ImportError:
+    return None
+  if is_jitted(f):
+    return f
+  if not jit:
+    return None
+  if f not in _jitted:
+    _jitted[f] = njit(f)
+  return _jitted[f]
+
+def jit_loop(name):
+  """
+  Returns the compiled version of the stepping loop name of this module.
+  """
+  if name not in _loops:
+    from numba import njit
+    _loops[name] = njit(globals()[name])
+  return _loops[name]
+
+
+def rk4(f, y, t, t1, dt, params):
+  # classical fourth-order Runge-Kutta from t to t1, see RungeKutta.
+  # Returns the final state and time, the number of steps and the size of
+  # the last one.
+  n = 0
+  while t < t1:
+    if t + dt > t1:
+      dt = t1 - t
+    k1 = f(t, y, *params) * dt
+    k2 = f(t + dt/2., y + k1/2., *params) * dt
+    k3 = f(t + dt/2., y + k2/2., *params) * dt
+    k4 = f(t + dt, y + k3, *params) * dt
+    y  = y + (1./6.) * (k1 + 2*k2 + 2*k3 + k4)
+    t += dt
+    n += 1
+  return y, t, n, dt
+
+def rk_embedded(f, y, t, t1, dt, eo, k, s, a, c, e, e3, alpha, q1, beta,
+                atol, rtol, S, hmax, hmin, params):
+  # adaptive embedded Runge-Kutta pair with first-same-as-last stage from
+  # t to t1, see EmbeddedRungeKutta.march().  The step has s stages, e and
+  # e3 give the error estimates (e3 empty if unused) and eo is the error of
+  # the previous step.  k[0] holds the derivative at (t,y) on entry and at
+  # the final state on return.  Returns the final state, time, proposed
+  # step size and error, the numbers of accepted and rejected steps and the
+  # smallest, largest and last accepted step.
+  n = y.size
+  naccept = 0
+  nreject = 0
+  hlo = float("inf")
+  hhi = 0.
+  hlast = 0.
+  while t < t1:
+    last = dt >= t1 - t
+    h    = t1 - t if last else dt
+
+    for i in range(1, s):
+      yt = y.copy()
+      for j in range(i):
+        if a[i,j] != 0.:
+          yt += (a[i,j] * h) * k[j]
+      k[i] = f(t + c[i] * h, yt, *params)
+
+    err  = 0.
+    err3 = 0.
+    for l in range(n):
+      d = 0.
+      for j in range(s):
+        d += e[j] * k[j,l]
+      scale = atol + max(abs(yt[l]), abs(y[l])) * rtol
+      err  += (d * h / scale)**2
+      if len(e3):
+        d = 0.
+        for j in range(s):
+          d += e3[j] * k[j,l]
+        err3 += (d * h / scale)**2
+    err = sqrt(err / n)
+    if len(e3):
+      den = sqrt(err**2 + .01 * err3 / n)
+      err = err**2 / den if den > 0. else 0.
+    ierr = 1. / max(err, 1e-10)
+
+    if err <= 1.:
+      t    = t1 if last else t + h
+      y    = yt
+      k[0] = k[s-1]
+      if not last:
+        fac = S * ierr ** alpha
+        if beta:
+          fac *= eo ** beta
+        dt = min(fac * h, hmax * h)
+      eo = max(err, 1e-4)
+      naccept += 1
+      hlo = min(hlo, h)
+      hhi = max(hhi, h)
+      hlast = h
+    else:
+      dt = max(S * ierr ** q1 * h, hmin * h)
+      nreject += 1
+  return y, t, dt, eo, naccept, nreject, hlo, hhi, hlast
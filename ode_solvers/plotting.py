@@ -0,0 +1,34 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Plotting style of the simulations.  Importing the package does not touch
+matplotlib; scripts that want the typeset figures call use_style() before
+plotting.
+"""
+
+def use_style(usetex=True):
+  """
+  Sets the serif fonts of the figures, and with usetex, LaTeX rendering of
+  all text with the fouriernc fonts.  This needs a LaTeX installation.
+  """
+  import matplotlib as mpl
+  mpl.rcParams['font.family']          = 'serif'
+  mpl.rcParams['legend.fontsize']      = 'medium'
+  if usetex:
+    mpl.rcParams['text.usetex']          = True
+    mpl.rcParams['text.latex.preamble']  = r'\usepackage{fouriernc}' '\n' \
+                                           r'\usepackage[mathscr]{euscript}'
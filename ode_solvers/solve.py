@@ -0,0 +1,176 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import find
+from ode_solvers import checkpoint
+from numpy import array, asarray, empty, searchsorted, amin
+
+class Stepper(object):
+  """
+  Integrates dy/dt = f(t,y,*args) from the state y0 at t0 with the
+  integrator method, a registered name or an Integrator subclass,
+  constructed with options.  jac(t,y,*jac_args) is the Jacobian, if any.
+  The current time and state are t and y.
+
+  The integrator's run() is called directly, without the argument checks
+  and copies of scipy's ode, and every call continues where the previous
+  one ended: integrators with a warm option are put in warm mode.
+  """
+
+  def __init__(self, f, t0, y0, method='RungeKutta45', args=(), jac=None,
+               jac_args=(), **options):
+    if not isinstance(method, type):
+      method = find(method)
+    self.integrator = method(**options)
+    if hasattr(self.integrator, 'warm'):
+      self.integrator.warm = True
+    self.f        = f
+    self.jac      = jac
+    self.args     = tuple(args)
+    self.jac_args = tuple(jac_args)
+    self.t        = t0
+    self.y        = self.integrator.as_state(y0)
+    self.integrator.reset(self.y.shape[-1], jac is not None)
+
+  @property
+  def success(self):
+    return bool(self.integrator.success)
+
+  @property
+  def stats(self):
+    return getattr(self.integrator, 'stats', None)
+
+  def step(self):
+    """
+    Advances by the integrator's next step size and returns the new state.
+    """
+    h = self.integrator.step_size(self.f, self.t, self.y, self.args)
+    return self.advance(self.t + h)
+
+  def advance(self, t1):
+    """
+    Integrates to the time t1 and returns the state there.
+    """
+    self.y, self.t = self.integrator.run(self.f, self.jac, self.y, self.t,
+                                         t1, self.args, self.jac_args)
+    return self.y
+
+  def dense(self, t_eval, out=None):
+    """
+    Integrates to the last of the increasing times t_eval, returning the
+    states at all of them in an array of shape (len(t_eval),) + y.shape,
+    written into out if given.  Integrators with a run_dense() method do
+    this in a single pass, the others stop at every output time.  The last
+    state is the one the run ends in, not an interpolant, so the next run
+    continues from it.  After a terminal event only the states up to the
+    event are returned.
+    """
+    t_eval = asarray(t_eval, dtype=float)
+    if out is None:
+      out = empty((len(t_eval),) + self.y.shape, dtype=self.y.dtype)
+    run_dense = getattr(self.integrator, 'run_dense', None)
+    if run_dense is not None:
+      run_dense(self.f, self.jac, self.y, self.t, t_eval, self.args,
+                self.jac_args, out)
+      stop = getattr(self.integrator, 'terminated', None)
+      if stop is not None:
+        self.t, self.y = stop
+        return out[:searchsorted(t_eval, self.t, 'right')]
+      self.y = out[-1].copy()
+      self.t = t_eval[-1]
+    else:
+      for i, t in enumerate(t_eval):
+        out[i] = self.advance(t) if t > self.t else self.y
+        if getattr(self.integrator, 'terminated', None) is not None:
+          return out[:searchsorted(t_eval, self.t, 'right')]
+    return out
+
+  def save(self, filename):
+    """
+    Saves the state of the integration to the checkpoint file filename,
+    see checkpoint.
+    """
+    checkpoint.save(filename, self.integrator.state(self.t, self.y))
+
+  def restore(self, filename):
+    """
+    Resumes the integration from the checkpoint file filename, written by
+    save() or by the integrator's checkpoint option during a run.  In the
+    latter case, advancing to the time the interrupted run was heading for
+    continues it bit for bit.
+    """
+    state = checkpoint.load(filename)
+    if str(state['method']) != type(self.integrator).__name__:
+      raise ValueError('%s holds a state of %s, not %s' % (filename,
+                       state['method'], type(self.integrator).__name__))
+    self.integrator.restore(state)
+    self.t = amin(state['t']).item()
+    self.y = self.integrator.as_state(state['y'])
+
+  def stream(self, t_eval, sink):
+    """
+    As dense(), but writes the states at the times t_eval to the sink,
+    see Sink, a batch of the sink at a time, so the memory used does not
+    grow with len(t_eval).
+    """
+    out = empty((sink.batch,) + self.y.shape, dtype=self.y.dtype)
+    for lo in range(0, len(t_eval), sink.batch):
+      t = asarray(t_eval[lo:lo + sink.batch], dtype=float)
+      self.dense(t, out[:len(t)])
+      sink.extend(t, out[:len(t)])
+    sink.flush()
+
+class Solution(object):
+  """
+  Result of solve(): the states y at the times t, with y of shape
+  (len(t),) + y0.shape, whether the integration succeeded and the stats
+  of the integrator.  With events, t_events[i] and y_events[i] are the
+  times and states of the zeros of the i-th event function, and
+  terminated is whether a terminal event ended the integration.
+  """
+
+  def __init__(self, t, y, success, stats, events=None, terminated=False):
+    self.t       = t
+    self.y       = y
+    self.success = success
+    self.stats   = stats
+    self.t_events = self.y_events = None
+    if events is not None:
+      self.t_events = [array(t) for t in events.t_events]
+      self.y_events = [array(y) for y in events.y_events]
+    self.terminated = terminated
+
+def solve(f, t_span, y0, method='RungeKutta45', t_eval=None, args=(),
+          jac=None, jac_args=(), **options):
+  """
+  Integrates dy/dt = f(t,y,*args) from y0 over t_span = (t0,t1) with the
+  integrator method and its options, see Stepper, and returns a Solution
+  at the increasing times t_eval, by default t0 and t1.  With a terminal
+  event in the events option, the solution stops at the event.
+  """
+  t0, t1 = t_span
+  s = Stepper(f, t0, y0, method, args, jac, jac_args, **options)
+  if t_eval is None:
+    y = empty((2,) + s.y.shape, dtype=s.y.dtype)
+    y[0] = s.y
+    y[1] = s.advance(t1)
+    t = array([t0, s.t], dtype=float)
+  else:
+    y = s.dense(t_eval)
+    t = asarray(t_eval, dtype=float)[:len(y)]
+  stop = getattr(s.integrator, 'terminated', None)
+  return Solution(t, y, s.success, s.stats,
+                  getattr(s.integrator, 'events', None), stop is not None)
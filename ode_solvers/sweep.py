@@ -0,0 +1,91 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.solve import Stepper
+from numpy import asarray, frombuffer, broadcast_to, iscomplexobj
+import multiprocessing
+
+# set in every worker process by _init()
+_shared = {}
+
+def _init(f, y0, params, t_eval, buf, shape, name, options):
+  _shared.update(f=f, y0=y0, params=params, t_eval=t_eval, name=name,
+                 options=options,
+                 out=frombuffer(buf, dtype=y0.dtype).reshape(shape))
+
+def _run(lo, hi):
+  # integrates the members lo to hi-1 into their rows of the shared result
+  # and returns their success flags.
+  s = _shared
+  success = []
+  for j in range(lo, hi):
+    r = Stepper(s['f'], s['t_eval'][0], s['y0'][j], s['name'],
+                s['params'][j], **s['options'])
+    r.dense(s['t_eval'], out=s['out'][j])
+    success.append(r.success)
+  return success
+
+def sweep(f, y0, t_eval, name, params=None, workers=None, chunksize=None,
+          **options):
+  """
+  Solves dy/dt = f(t,y,*params[j]) from y0[j] for every member j of a
+  parameter sweep, with the integrator name and its options, at the times
+  t_eval starting from t_eval[0].
+
+  y0 is an array of shape (m,n), or a single state used by every member;
+  params is a sequence of m tuples of parameters, or None for one member
+  per row of y0, or a single one.  The members are split into chunks of
+  chunksize and run by a pool of workers processes (by default one per
+  CPU); with workers=1 they run in this process.  The workers write
+  straight into a shared array of shape (m,len(t_eval),n), complex for
+  complex states and double otherwise, returned in submission order
+  together with the success flags, so no solution is pickled back.  f must
+  be picklable, i.e. defined at module level.
+  """
+  t_eval = asarray(t_eval, dtype=float)
+  y0     = asarray(y0, dtype=complex if iscomplexobj(y0) else float)
+  if params is not None:
+    m = len(params)
+  else:
+    m = len(y0) if y0.ndim > 1 else 1
+  if params is None:
+    params = [()] * m
+  if y0.ndim == 1:
+    y0 = broadcast_to(y0, (m, y0.size))
+  shape  = (m, len(t_eval), y0.shape[1])
+
+  # a complex number takes two doubles
+  size = shape[0] * shape[1] * shape[2] * (y0.itemsize // 8)
+  buf  = multiprocessing.RawArray('d', size)
+  args = (f, y0, params, t_eval, buf, shape, name, options)
+  if workers is None:
+    workers = multiprocessing.cpu_count()
+  if chunksize is None:
+    chunksize = max(1, m // (4 * workers))
+  chunks = [(lo, min(lo + chunksize, m)) for lo in range(0, m, chunksize)]
+
+  if workers == 1:
+    _init(*args)
+    success = [_run(lo, hi) for lo, hi in chunks]
+  else:
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(workers, initializer=_init,
+                             initargs=args) as pool:
+      futures = [pool.submit(_run, lo, hi) for lo, hi in chunks]
+      success = [future.result() for future in futures]
+
+  return frombuffer(buf, dtype=y0.dtype).reshape(shape), \
+         asarray(sum(success, []))
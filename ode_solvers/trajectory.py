@@ -0,0 +1,50 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from ode_solvers.Integrator import Integrator
+from numpy import array, asarray, empty, searchsorted
+
+def trajectory(r, t_eval, out=None):
+  """
+  Returns the solution of the scipy ode object r at each of the increasing
+  times t_eval, computed in a single pass of its integrator's run_dense()
+  if it has one, and by integrating to every time otherwise.  The result
+  has shape (len(t_eval),) + r.y.shape and is written into out if given.
+  Afterwards r is left at t_eval[-1], as after r.integrate(), or at the
+  terminal event that stopped it, with only the states up to the event
+  returned.
+  """
+  t_eval = asarray(t_eval, dtype=float)
+  mth = r._integrator
+  run_dense = getattr(mth, 'run_dense', None)
+  if run_dense is not None:
+    out = run_dense(r.f, r.jac, r._y, r.t, t_eval, r.f_params,
+                    r.jac_params, out)
+    stop = getattr(mth, 'terminated', None)
+    r.t, r._y = stop if stop is not None else (t_eval[-1], out[-1])
+    r._y = array(r._y)
+  else:
+    if out is None:
+      dtype = mth.state_type(r._y) if isinstance(mth, Integrator) \
+              else r._y.dtype
+      out = empty((len(t_eval),) + r._y.shape, dtype=dtype)
+    for i, t in enumerate(t_eval):
+      out[i] = r.integrate(t) if t > r.t else r._y
+      if getattr(mth, 'terminated', None) is not None:
+        break
+  if getattr(mth, 'terminated', None) is not None:
+    return out[:searchsorted(t_eval, r.t, 'right')]
+  return out
@@ -0,0 +1,67 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Times importing the package in fresh interpreters.
+import subprocess
+import sys
+import time
+import os
+
+try:
+  clock = time.perf_counter
+except AttributeError:
+  clock = time.time
+
+
+# Statements timed in a fresh interpreter each.  The last one is what
+# importing the package used to cost: matplotlib was imported and the
+# LaTeX rcParams set by ode_solvers/__init__.py.
+statements = [('numpy',                  'import numpy'),
+              ('scipy.integrate',        'import scipy.integrate'),
+              ('ode_solvers',            'import ode_solvers'),
+              ('ode_solvers + style',    'import ode_solvers, ode_solvers.plotting;'
+                                         'ode_solvers.plotting.use_style()')]
+
+check = 'import sys, ode_solvers;' \
+        'print(sorted(m for m in ("matplotlib", "pylab") if m in sys.modules))'
+
+
+def measure(stmt, repeat=7):
+  """
+  Returns the best wall time of repeat fresh interpreters running stmt,
+  less that of an interpreter doing nothing.
+  """
+  devnull = open(os.devnull, 'w')
+  def best(code):
+    times = []
+    for j in range(repeat):
+      t1 = clock()
+      subprocess.check_call([sys.executable, '-c', code], stderr=devnull)
+      times.append(clock() - t1)
+    return min(times)
+  return best(stmt) - best('pass')
+
+
+print('%-22s %10s' % ('import', 'time [ms]'))
+for name, stmt in statements:
+  try:
+    print('%-22s %10.1f' % (name, 1e3*measure(stmt)))
+  except subprocess.CalledProcessError:
+    print('%-22s %10s' % (name, 'failed'))
+
+out = subprocess.check_output([sys.executable, '-c', check])
+print('plotting modules loaded by import ode_solvers: %s'
+      % out.decode().strip())
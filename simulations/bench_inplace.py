@@ -0,0 +1,89 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Times the fixed-step methods with and without the inplace option, and
+# the memory a step allocates.
+from scipy.integrate import ode
+import ode_solvers    # registers the integrators with scipy's ode
+
+from numpy import ones, negative
+import time
+
+try:
+  clock = time.perf_counter
+except AttributeError:
+  clock = time.time
+
+try:
+  import tracemalloc
+except ImportError:
+  tracemalloc = None
+
+
+# Linear decay of a large state, once returning a new array and once
+# writing into the buffer supplied by the integrator.
+def decay(t, y):
+  return -y
+
+def decay_into(t, y, out):
+  return negative(y, out=out)
+
+
+n     = 100000       # State size
+steps = 1000         # Steps per run
+dt    = 1e-3         # Time step
+y0    = ones(n)
+
+
+def measure(name, f, inplace):
+  """
+  Returns the time per step of a run, and the memory allocated by a single
+  step in units of the state size.  The latter drives the step kernel
+  directly, needs tracemalloc (Python 3) and is None otherwise.
+  """
+  i = ode(f)
+  i.set_integrator(name, dt=dt, inplace=inplace)
+  i.set_initial_value(y0, 0.)
+
+  t1 = clock()
+  i.integrate(steps*dt)
+  t2 = clock()
+
+  alloc = None
+  if tracemalloc is not None:
+    m  = i._integrator
+    y  = y0.copy()
+    fy = decay(0., y)
+    yn = y.copy()
+    w  = [y.copy() for j in range(m.work)]
+    m.restart()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    if inplace:
+      m.step_into(f, 0., y, fy, dt, (), yn, w)
+    else:
+      yn = m.step(f, 0., y, fy, dt, ())
+    alloc = (tracemalloc.get_traced_memory()[1] - base) / (8. * n)
+    tracemalloc.stop()
+  return (t2 - t1) / steps, alloc
+
+
+for name in ['Euler', 'EulerRichardson', 'EulerCromer', 'RungeKutta']:
+  for f, inplace in [(decay, False), (decay_into, True)]:
+    s, alloc = measure(name, f, inplace)
+    print('%-16s inplace=%-5s %8.1f us/step   allocated per step: %s' \
+          % (name, inplace, 1e6*s, 'n/a' if alloc is None else \
+             '%.1f states' % alloc))
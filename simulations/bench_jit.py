@@ -0,0 +1,72 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Times the Python and numba loops of the RK methods, see ode_solvers.jit.
+from scipy.integrate import ode
+import ode_solvers    # registers the integrators with scipy's ode
+
+from numpy import array
+import time
+
+try:
+  clock = time.perf_counter
+except AttributeError:
+  clock = time.time
+
+try:
+  from numba import njit
+except ImportError:
+  njit = None
+
+
+# Simple harmonic oscillator as in odeSho.py.
+def sho(t,y,k,m):
+  return array([y[1], -k/m*y[0]])
+
+
+y0, t0 = [1.,0.], 0.
+tf = 200.            # Final time
+k  = 1.              # Spring constant
+m  = 9.              # Mass on the Spring
+
+
+def measure(name, f, jit, **kw):
+  """
+  Returns the best wall time of three runs from t0 to tf and the final
+  state.  The first run also compiles the loop and is discarded.
+  """
+  i = ode(f)
+  i.set_integrator(name, jit=jit, **kw)
+  times = []
+  for j in range(4):
+    i.set_initial_value(y0, t0)
+    i.set_f_params(k, m)
+    t1 = clock()
+    i.integrate(tf)
+    times.append(clock() - t1)
+  return min(times[1:]), i.y
+
+
+if njit is None:
+  print('numba is not installed, only the Python loops are timed')
+
+for name, kw in [('RungeKutta', {'dt' : .01}), ('RungeKutta45', {})]:
+  s, y = measure(name, sho, False, **kw)
+  print('%-13s python   %8.4f s   y = %s' % (name, s, y))
+  if njit is not None:
+    s2, y2 = measure(name, njit(sho), None, **kw)
+    print('%-13s numba    %8.4f s   y = %s   speedup %.0fx' \
+          % (name, s2, y2, s/s2))
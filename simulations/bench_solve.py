@@ -0,0 +1,89 @@
+#
+#    Copyright (C) <2012>  <cummings.evan@gmail.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Times the native Stepper and solve() against scipy's ode for many
+# short calls, where the overhead of the interface dominates.
+from scipy.integrate import ode
+from ode_solvers import solve, Stepper
+
+from numpy import array
+import time
+
+try:
+  clock = time.perf_counter
+except AttributeError:
+  clock = time.time
+
+
+# Simple harmonic oscillator as in odeSho.py.
+def sho(t,y,k,m):
+  return array([y[1], -k/m*y[0]])
+
+
+y0, t0 = [1.,0.], 0.
+k  = 1.              # Spring constant
+m  = 9.              # Mass on the Spring
+n  = 20000           # number of calls timed
+dt = .01
+
+
+def best(run, repeat=5):
+  """
+  Returns the best wall time of repeat calls of run.
+  """
+  times = []
+  for j in range(repeat):
+    t1 = clock()
+    run()
+    times.append(clock() - t1)
+  return min(times)
+
+def integrate_scipy():
+  # one Euler step per call of ode.integrate
+  i = ode(sho)
+  i.set_integrator('Euler', dt=dt)
+  i.set_initial_value(y0, t0)
+  i.set_f_params(k, m)
+  for j in range(1, n+1):
+    i.integrate(j*dt)
+
+def integrate_native():
+  s = Stepper(sho, t0, y0, 'Euler', (k, m), dt=dt)
+  for j in range(1, n+1):
+    s.advance(j*dt)
+
+def setup_scipy():
+  # a short problem set up and solved from scratch every call
+  for j in range(n // 10):
+    i = ode(sho)
+    i.set_integrator('Euler', dt=dt)
+    i.set_initial_value(y0, t0)
+    i.set_f_params(k, m)
+    i.integrate(dt)
+
+def setup_native():
+  for j in range(n // 10):
+    solve(sho, (t0, dt), y0, 'Euler', args=(k, m), dt=dt)
+
+
+print('%-28s %10s %10s %8s' % ('', 'scipy ode', 'native', 'ratio'))
+for name, a, b, calls in [('integrate one step', integrate_scipy,
+                           integrate_native, n),
+                          ('set up and solve', setup_scipy,
+                           setup_native, n // 10)]:
+  s1, s2 = best(a), best(b)
+  print('%-28s %8.2f us %8.2f us %7.2fx' \
+        % (name, 1e6*s1/calls, 1e6*s2/calls, s1/s2))
@@ -1,15 +1,17 @@
-import sys
-sys.path.append('../')
-
-from scipy.integrate.ode import *
+# Plots the error and time of a single erf integral.  For timings of every
+# integrator on a set of problems, see ode_solvers/benchmark.py.
+from scipy.integrate import ode
+import math
 import time
 
-import src.Euler as Euler
-import src.EulerRichardson as EulerRichardson
-import src.RungeKutta as RungeKutta
-import src.RungeKutta45 as RungeKutta45
+import ode_solvers.Euler           as Euler
+import ode_solvers.EulerRichardson as EulerRichardson
+import ode_solvers.RungeKutta      as RungeKutta
+import ode_solvers.RungeKutta45    as RungeKutta45
+from ode_solvers.plotting    import use_style
 
 from pylab import *
+use_style(usetex=False)
 from scipy.special import erf
 
 def rhs(t, x):
@@ -38,7 +40,7 @@ for i in integrators:
     o.integrate(1.0)
     t2 = time.time()
     intTime[c].append(t2 - t1)
-    print i + ' time: %f\n' % (t2 - t1)
+    print(i + ' time: %f\n' % (t2 - t1))
     diff = abs(erf(1) - o.y[0])
     errs.append(diff)
   plot(dts, errs, lineStyle[c], label=i)
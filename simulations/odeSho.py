@@ -5,11 +5,14 @@ import ode_solvers.EulerRichardson as EulerRichardson
 import ode_solvers.EulerCromer     as EulerCromer
 import ode_solvers.Predictor       as Predictor
 import ode_solvers.RungeKutta      as RungeKutta
+from ode_solvers.trajectory  import trajectory
+from ode_solvers.plotting    import use_style
  
 from numpy import arange,vstack,array, sqrt
 from pylab import *
 from mpl_toolkits.axes_grid1.inset_locator import zoomed_inset_axes
 from mpl_toolkits.axes_grid1.inset_locator import mark_inset
+use_style()
 
 
 
@@ -45,13 +48,6 @@ k = 1.               # Spring constant
 m = 9.               # Mass on the Spring
 
 
-# Position arrays
-yfE = [array(y0)]
-yfEC = [array(y0)]
-yfER = [array(y0)]
-yfRK = [array(y0)]
-yfPC = [array(y0)]
-
 # Times to evaluate a solution. 
 time = arange(t0,tf,dt)
 
@@ -62,51 +58,36 @@ time = arange(t0,tf,dt)
 # CREATE ODE OBJECTS
 i = ode(sho)
 
-# Main loops for the integration
+# Solutions at the output times, each from a single pass of the integrator
 # Euler Method:
 i.set_integrator('Euler',dt=.05)
 i.set_initial_value(y0,t0)
 i.set_f_params(k, m)
-for t in time:
-    i.integrate(i.t+dt)
-    yfE.append(i.y)
-yfE = array(yfE)
+yfE = trajectory(i, time)
 
 # Euler-Richardson Method:
 i.set_integrator('EulerRichardson',dt=.05)
 i.set_initial_value(y0,t0)
 i.set_f_params(k, m)
-for t in time:
-    i.integrate(i.t+dt)
-    yfER.append(i.y)
-yfER = array(yfER)
+yfER = trajectory(i, time)
 
 # Euler-Cromer Method:
 i.set_integrator('EulerCromer',dt=.05)
 i.set_initial_value(y0,t0)
 i.set_f_params(k, m)
-for t in time:
-    i.integrate(i.t+dt)
-    yfEC.append(i.y) 
-yfEC = array(yfEC)
+yfEC = trajectory(i, time)
 
 # RungeKutta Method:
 i.set_integrator('RungeKutta',dt=.05)
 i.set_initial_value(y0,t0)
 i.set_f_params(k, m)
-for t in time:
-    i.integrate(i.t+dt)
-    yfRK.append(i.y)
-yfRK = array(yfRK)
+yfRK = trajectory(i, time)
 
 # Predictor-Corrector Method:
 i.set_integrator('Predictor',dt=.05)
 i.set_initial_value(y0,t0)
 i.set_f_params(k, m)
-for t in time:
-    i.integrate(i.t+dt)
-    yfPC.append(i.y)
-yfPC = array(yfPC)
+yfPC = trajectory(i, time)
 
 
 
@@ -131,11 +112,11 @@ fig = figure(figsize=(8,5))
 ax = fig.add_subplot(111, ylim=(-2.5,2.5))
 
 #text(0.5, 10, "discrepancy: %f" % (disc))
-plot(time, yfE[1:,0],  lw=2.0, color='k',  ls='-',  label='Euler')
-#plot(time, yfER[1:,0], lw=2.0, color='b',  ls='-',  label='Euler-Richardson')
-plot(time, yfEC[1:,0], lw=2.0, color=grun, ls='-',  label='Euler-Cromer')
-#plot(time, yfRK[1:,0], lw=2.0, color=purp, ls='-',  label='Runge-Kutta')
-plot(time, yfPC[1:,0], lw=2.0, color=purp, ls='-',  label='Predictor-Corrector')
+plot(time, yfE[:,0],  lw=2.0, color='k',  ls='-',  label='Euler')
+#plot(time, yfER[:,0], lw=2.0, color='b',  ls='-',  label='Euler-Richardson')
+plot(time, yfEC[:,0], lw=2.0, color=grun, ls='-',  label='Euler-Cromer')
+#plot(time, yfRK[:,0], lw=2.0, color=purp, ls='-',  label='Runge-Kutta')
+plot(time, yfPC[:,0], lw=2.0, color=purp, ls='-',  label='Predictor-Corrector')
 plot(time, yT,         lw=2.0, color='r',  ls='--', label='Analytical')
 
 # Legend formatting:
@@ -161,11 +142,11 @@ xticks(visible=False)
 yticks(visible=False)
 grid()
 mark_inset(ax, axins, loc1=2, loc2=4, fc="none", ec="0.5")
-plot(time, yfE[1:,0],  lw=2.0, color='k',  ls='-',  label='Euler')
-#plot(time, yfER[1:,0], lw=2.0, color='b',  ls='-',  label='Euler-Richardson')
-plot(time, yfEC[1:,0], lw=2.0, color=grun, ls='-',  label='Euler-Cromer')
-#plot(time, yfRK[1:,0], lw=2.0, color=purp, ls='-',  label='Runge-Kutta')
-plot(time, yfPC[1:,0], lw=2.0, color=purp, ls='-',  label='Predictor-Corrector')
+plot(time, yfE[:,0],  lw=2.0, color='k',  ls='-',  label='Euler')
+#plot(time, yfER[:,0], lw=2.0, color='b',  ls='-',  label='Euler-Richardson')
+plot(time, yfEC[:,0], lw=2.0, color=grun, ls='-',  label='Euler-Cromer')
+#plot(time, yfRK[:,0], lw=2.0, color=purp, ls='-',  label='Runge-Kutta')
+plot(time, yfPC[:,0], lw=2.0, color=purp, ls='-',  label='Predictor-Corrector')
 plot(time, yT,         lw=2.0, color='r',  ls='--', label='Analytical')
 
 tight_layout()
@@ -0,0 +1,71 @@
+"""
+solve_async() with a process executor, which pickles the Stepper with
+every segment.
+"""
+import pickle
+import pytest
+from numpy import array, linspace, allclose
+from ode_solvers import solve, Stepper
+
+futures = pytest.importorskip('concurrent.futures')
+asyncio = pytest.importorskip('asyncio')
+
+def kepler(t, y):
+  r3 = (y[0]**2 + y[1]**2)**1.5
+  return array([y[2], y[3], -y[0]/r3, -y[1]/r3])
+
+y0 = [1., 0., 0., 1.]
+
+def test_threaded_bulirsch_stoer_pickles():
+  s = Stepper(kepler, 0., y0, 'BulirschStoer', threads=2, rtol=1e-10)
+  s.advance(1.)
+  r = pickle.loads(pickle.dumps(s))
+  assert (r.advance(2.) == s.advance(2.)).all()
+
+def test_process_executor():
+  from ode_solvers import solve_async
+  t_eval = linspace(0., 5., 11)
+  loop = asyncio.new_event_loop()
+  try:
+    with futures.ProcessPoolExecutor(2) as executor:
+      s = loop.run_until_complete(solve_async(
+            kepler, (0., 5.), y0, 'BulirschStoer', t_eval, steps=5,
+            executor=executor, threads=2, rtol=1e-10))
+  finally:
+    loop.close()
+  r = solve(kepler, (0., 5.), y0, 'BulirschStoer', t_eval, rtol=1e-10)
+  assert s.success
+  assert allclose(s.y, r.y, rtol=0., atol=1e-9)
+
+def decay(t, y):
+  return -y
+
+def test_segments_without_output_times():
+  # the default t_eval=[t0,t1] still returns to the event loop every
+  # steps steps, where progress is reported and the task can be cancelled
+  from ode_solvers import solve_async
+  calls = []
+  def progress(t, y):
+    calls.append(t)
+  loop = asyncio.new_event_loop()
+  try:
+    s = loop.run_until_complete(solve_async(
+          decay, (0., 1.), [1.], 'RungeKutta', steps=100, dt=1e-3,
+          progress=progress))
+    assert s.success and s.t.tolist() == [0., 1.]
+    assert abs(s.y[-1,0] - 0.36787944117144233) < 1e-12
+    # ten segments of 100 steps, and one more for rounding
+    assert 10 <= len(calls) <= 11
+
+    async def cancelled():
+      task = loop.create_task(solve_async(
+               decay, (0., 50.), [1.], 'RungeKutta', steps=100, dt=1e-3,
+               progress=lambda t, y: task.cancel() if t > 1. else None))
+      try:
+        await task
+      except asyncio.CancelledError:
+        return True
+      return False
+    assert loop.run_until_complete(cancelled())
+  finally:
+    loop.close()
@@ -0,0 +1,64 @@
+"""
+BDF with banded and sparse Jacobians, differenced or given, follows the
+dense solution at a fraction of the evaluations of f.
+"""
+import pytest
+from numpy import zeros, ones, linspace, sin, pi, diag, vstack, hstack
+from scipy.sparse import diags
+from ode_solvers import solve
+
+n = 60
+D = 100.
+
+def reaction_diffusion(t, y):
+  # heat equation on n cells with zero boundary values and y' = -y**2
+  dy = -2*y - y**2/D
+  dy[1:]  += y[:-1]
+  dy[:-1] += y[1:]
+  return D*dy
+
+def derivative(y):
+  return D*(-2 - 2*y/D), D*ones(n - 1)
+
+def dense_jac(t, y):
+  d, o = derivative(y)
+  return diag(d) + diag(o, 1) + diag(o, -1)
+
+def banded_jac(t, y):
+  # jac[uband + i - j, j] = dfdy[i,j]
+  d, o = derivative(y)
+  return vstack((hstack((0., o)), d, hstack((o, 0.))))
+
+def sparse_jac(t, y):
+  d, o = derivative(y)
+  return diags([o, d, o], [-1, 0, 1], format='csc')
+
+y0     = sin(pi*linspace(0., 1., n + 2)[1:-1])
+t_eval = linspace(0., .5, 6)
+tridiagonal = diags([ones(n - 1), ones(n), ones(n - 1)], [-1, 0, 1])
+
+def run(**options):
+  return solve(reaction_diffusion, (0., .5), y0, 'BDF', t_eval,
+               rtol=1e-6, atol=1e-9, **options)
+
+reference = run()
+
+@pytest.mark.parametrize('options', [
+  {'lband': 1, 'uband': 1}, {'jac_sparsity': tridiagonal}])
+def test_differenced(options):
+  s = run(**options)
+  assert s.success
+  assert abs(s.y - reference.y).max() < 1e-6
+  # three groups of columns to difference instead of n
+  assert s.stats.njev == reference.stats.njev
+  assert s.stats.nfev == reference.stats.nfev - (n - 3)*s.stats.njev
+
+@pytest.mark.parametrize('jac, options', [
+  (dense_jac, {}), (banded_jac, {'lband': 1, 'uband': 1}),
+  (sparse_jac, {'jac_sparsity': tridiagonal})])
+def test_given(jac, options):
+  s = run(jac=jac, **options)
+  assert s.success
+  assert abs(s.y - reference.y).max() < 1e-6
+  assert s.stats.njev == reference.stats.njev
+  assert s.stats.nfev <= reference.stats.nfev - n*s.stats.njev
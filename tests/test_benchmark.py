@@ -0,0 +1,21 @@
+"""
+The benchmark driver over every registered integrator.
+"""
+import json
+import ode_solvers
+from ode_solvers import benchmark
+
+def test_every_integrator_runs():
+  results = benchmark.run(repeat=1)
+  assert set(r['integrator'] for r in results) == set(ode_solvers.integrators)
+  assert [benchmark.key(r) for r in results if not r['success']] == []
+
+def test_main_writes_results(tmpdir):
+  filename = str(tmpdir.join('bench.json'))
+  assert benchmark.main(['--integrators', 'ETDRK4', 'RungeKutta',
+                         '--problems', 'sho', '--repeat', '1',
+                         '--json', filename]) == 0
+  with open(filename) as f:
+    results = json.load(f)
+  assert [r['options'] for r in results if r['integrator'] == 'RungeKutta'] \
+         == [{'dt' : dt} for dt in benchmark.dts]
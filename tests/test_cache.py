@@ -0,0 +1,77 @@
+"""
+RHSCache answers repeated evaluations without changing the results.
+"""
+import pytest
+from numpy import array, linspace, empty
+from scipy.integrate import ode
+from ode_solvers import RHSCache, Stepper
+
+def vdp(t, y):
+  return array([y[1], (1 - y[0]**2)*y[1] - y[0]])
+
+def vdp_into(t, y, out):
+  out[0] = y[1]
+  out[1] = (1 - y[0]**2)*y[1] - y[0]
+
+class Counted(object):
+  def __init__(self, f):
+    self.f = f
+    self.calls = 0
+  def __call__(self, *args):
+    self.calls += 1
+    return self.f(*args)
+
+def integrate(f, method, **options):
+  r = ode(f).set_integrator(method, **options)
+  r.set_initial_value([2., 0.], 0.)
+  return array([r.integrate(t) for t in linspace(0., 10., 101)[1:]])
+
+def test_scipy_ode_restarts():
+  # RungeKutta45 evaluates f again at the start of every integrate()
+  f = Counted(vdp)
+  cache = RHSCache(f)
+  y = integrate(cache, 'RungeKutta45', rtol=1e-8)
+  assert (y == integrate(vdp, 'RungeKutta45', rtol=1e-8)).all()
+  assert cache.hits >= 99
+  assert f.calls == cache.misses
+  assert len(cache.entries) <= cache.size
+
+def test_inplace():
+  f = Counted(vdp_into)
+  cache = RHSCache(f, inplace=True)
+  s = Stepper(cache, 0., [2., 0.], 'RungeKutta', dt=1e-2, inplace=True)
+  r = Stepper(vdp_into, 0., [2., 0.], 'RungeKutta', dt=1e-2, inplace=True)
+  for t in linspace(0., 1., 11)[1:]:
+    assert (s.advance(t) == r.advance(t)).all()
+  assert f.calls == cache.misses
+  out = empty(2)
+  y = array([1., 2.])
+  cache(0., y, out)
+  hits = cache.hits
+  out[:] = 0.
+  assert (cache(0., y.copy(), out) == vdp(0., y)).all()
+  assert cache.hits == hits + 1
+
+def test_hits():
+  f = Counted(vdp)
+  cache = RHSCache(f, size=2)
+  y = array([1., 2.])
+  a = cache(0., y)
+  assert cache(0., y.copy()) is a
+  assert not a.flags.writeable
+  cache(1., y)
+  cache(2., y)
+  cache(0., y)
+  assert (cache.hits, cache.misses, f.calls) == (1, 4, 4)
+
+def test_identity():
+  cache = RHSCache(vdp, key='identity')
+  y = array([1., 2.])
+  cache(0., y)
+  cache(0., y)
+  cache(0., y.copy())
+  assert (cache.hits, cache.misses) == (1, 2)
+
+def test_inplace_without_option():
+  with pytest.raises(TypeError):
+    RHSCache(vdp_into)(0., array([1., 2.]), empty(2))
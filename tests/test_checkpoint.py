@@ -0,0 +1,36 @@
+"""
+Runs resumed from a Checkpoint continue bit for bit.
+"""
+import pytest
+from numpy import array
+from scipy.integrate import ode
+from ode_solvers import Stepper, Checkpoint, checkpoint
+
+def vdp(t, y):
+  return array([y[1], (1 - y[0]**2)*y[1] - y[0]])
+
+@pytest.mark.parametrize('method', ['RungeKutta45', 'DormandPrince853',
+                                    'RungeKutta'])
+def test_stepper_resume(tmpdir, method):
+  filename = str(tmpdir.join('run.npz'))
+  s = Stepper(vdp, 0., [2., 0.], method, rtol=1e-8,
+              checkpoint=Checkpoint(filename, steps=7))
+  y = s.advance(10.)
+  r = Stepper(vdp, 0., [2., 0.], method, rtol=1e-8)
+  r.restore(filename)
+  assert 0. < r.t < 10.
+  assert (r.advance(10.) == y).all()
+
+@pytest.mark.parametrize('method', ['RungeKutta45', 'DormandPrince853'])
+def test_ode_resume(tmpdir, method):
+  # scipy's ode does not put the integrator in warm mode
+  filename = str(tmpdir.join('run.npz'))
+  r = ode(vdp).set_integrator(method, rtol=1e-8,
+                              checkpoint=Checkpoint(filename, steps=7))
+  r.set_initial_value([2., 0.], 0.)
+  y = r.integrate(10.)
+  state = checkpoint.load(filename)
+  q = ode(vdp).set_integrator(method, rtol=1e-8)
+  q.set_initial_value(state['y'], state['t'].min())
+  q._integrator.restore(state)
+  assert (q.integrate(10.) == y).all()
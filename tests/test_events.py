@@ -0,0 +1,54 @@
+"""
+Events located on the interpolants of the adaptive and fixed-step methods.
+"""
+import pytest
+from numpy import array, pi, ones
+from ode_solvers import solve
+
+def oscillator(t, y):
+  return array([y[1], -y[0]])
+
+def position(t, y):
+  return y[0]
+
+METHODS = [('RungeKutta45', {'rtol': 1e-10, 'atol': 1e-12}, 1e-8),
+           ('DormandPrince853', {'rtol': 1e-10, 'atol': 1e-12}, 1e-8),
+           ('RungeKutta', {'dt': 1e-2}, 1e-7)]
+
+@pytest.mark.parametrize('method, options, tol', METHODS)
+def test_location(method, options, tol):
+  # cos t vanishes at odd multiples of pi/2
+  s = solve(oscillator, (0., 10.), [1., 0.], method, events=position,
+            **options)
+  assert not s.terminated
+  assert len(s.t_events[0]) == 3
+  assert abs(s.t_events[0] - array([.5, 1.5, 2.5])*pi).max() < tol
+  assert abs(s.y_events[0][:,0]).max() < tol
+
+@pytest.mark.parametrize('method, options, tol', METHODS)
+def test_terminal(method, options, tol):
+  def event(t, y):
+    return y[0]
+  event.terminal = True
+  s = solve(oscillator, (0., 10.), [1., 0.], method, events=event,
+            t_eval=[0., 1., 2., 3.], **options)
+  assert s.terminated
+  assert len(s.t) == 2
+  assert abs(s.t_events[0] - [pi/2]).max() < tol
+  assert abs(s.y[-1] - [0.5403023058681398, -0.8414709848078965]).max() < tol
+
+@pytest.mark.parametrize('method, options, tol', METHODS)
+@pytest.mark.parametrize('direction, times', [(1, [1.5]), (-1, [.5, 2.5])])
+def test_direction(method, options, tol, direction, times):
+  def event(t, y):
+    return y[0]
+  event.direction = direction
+  s = solve(oscillator, (0., 10.), [1., 0.], method, events=event,
+            **options)
+  assert abs(s.t_events[0] - array(times)*pi).max() < tol
+
+@pytest.mark.parametrize('method', ['RungeKutta45', 'RungeKutta'])
+def test_ensemble_rejected(method):
+  with pytest.raises(ValueError, match='single state'):
+    solve(lambda t, y: -y, (0., 1.), ones((3, 2)), method,
+          events=position)
@@ -0,0 +1,15 @@
+"""
+The fixed-step methods given a tolerance instead of a step size.
+"""
+from ode_solvers import Stepper
+
+def decay(t, y):
+  return -y
+
+def test_zero_length_run_leaves_the_step_to_the_next():
+  s = Stepper(decay, 0., [1.], 'RungeKutta', rtol=1e-6)
+  assert (s.advance(0.) == [1.]).all()
+  y = s.advance(1.)
+  assert s.success
+  assert (y == Stepper(decay, 0., [1.], 'RungeKutta', rtol=1e-6)
+                 .advance(1.)).all()
@@ -0,0 +1,29 @@
+"""
+Importing the package leaves scipy.integrate, asyncio and multiprocessing
+alone until they are used.
+"""
+import subprocess
+import sys
+
+def run(code):
+  return subprocess.check_output([sys.executable, '-c', code]).decode()
+
+def test_lazy_imports():
+  out = run('import sys, ode_solvers\n'
+            'print(sorted(m for m in ("scipy.integrate", "asyncio",\n'
+            '      "multiprocessing") if m in sys.modules))')
+  assert out.strip() == '[]'
+
+def test_scipy_ode_after_import():
+  out = run('import ode_solvers\n'
+            'from scipy.integrate import ode\n'
+            'r = ode(lambda t, y: -y).set_integrator("Tsitouras45")\n'
+            'print(type(r._integrator).__name__)')
+  assert out.strip() == 'Tsitouras45'
+
+def test_scipy_ode_before_import():
+  out = run('from scipy.integrate import ode\n'
+            'import ode_solvers\n'
+            'r = ode(lambda t, y: -y).set_integrator("Tsitouras45")\n'
+            'print(type(r._integrator).__name__)')
+  assert out.strip() == 'Tsitouras45'
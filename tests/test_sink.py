@@ -0,0 +1,51 @@
+"""
+Trajectories streamed to a sink read back as the in-memory results.
+"""
+import pytest
+from numpy import array, concatenate, linspace
+from ode_solvers import Stepper, NpySink, MemmapSink, HDF5Sink
+from ode_solvers.Sink import load
+def vdp(t, y):
+  return array([y[1], (1 - y[0]**2)*y[1] - y[0]])
+
+t_eval = linspace(0., 10., 1001)
+
+def dense(batch):
+  # the runs of stream(), ending at the last time of every batch
+  s = Stepper(vdp, 0., [2., 0.], rtol=1e-8)
+  return concatenate([s.dense(t_eval[i:i + batch])
+                      for i in range(0, len(t_eval), batch)])
+
+@pytest.mark.parametrize('kind', [NpySink, MemmapSink])
+def test_stream(tmpdir, kind):
+  # batches and capacity not dividing the number of states
+  filename = str(tmpdir.join('run.npy'))
+  options = {'capacity': 300} if kind is MemmapSink else {}
+  with kind(filename, batch=64, **options) as sink:
+    Stepper(vdp, 0., [2., 0.], rtol=1e-8).stream(t_eval, sink)
+  t, y = load(filename)
+  assert (t == t_eval).all()
+  assert (y == dense(64)).all()
+
+def test_callback(tmpdir):
+  # every accepted step, appended one at a time
+  filename = str(tmpdir.join('steps.npy'))
+  steps = []
+  s = Stepper(vdp, 0., [2., 0.], rtol=1e-6,
+              callback=lambda t, y: steps.append((t, y.copy())))
+  s.advance(10.)
+  with NpySink(filename, batch=16) as sink:
+    s = Stepper(vdp, 0., [2., 0.], rtol=1e-6, callback=sink.append)
+    s.advance(10.)
+  t, y = load(filename)
+  assert (t == [u for u, v in steps]).all()
+  assert (y == [v for u, v in steps]).all()
+
+def test_hdf5(tmpdir):
+  h5py = pytest.importorskip('h5py')
+  filename = str(tmpdir.join('run.h5'))
+  with HDF5Sink(filename, '/run', batch=64) as sink:
+    Stepper(vdp, 0., [2., 0.], rtol=1e-8).stream(t_eval, sink)
+  with h5py.File(filename, 'r') as f:
+    assert (f['/run/t'][:] == t_eval).all()
+    assert (f['/run/y'][:] == dense(64)).all()
@@ -0,0 +1,58 @@
+"""
+Stepper runs continue where the previous one ended.
+"""
+import pytest
+from numpy import array, exp, linspace
+from scipy.integrate import ode
+from ode_solvers import Stepper
+
+def vdp(t, y):
+  return array([y[1], (1 - y[0]**2)*y[1] - y[0]])
+
+@pytest.mark.parametrize('method, options', [
+  ('RungeKutta45', {'rtol': 1e-8}), ('DormandPrince853', {'rtol': 1e-8}),
+  ('Adams', {'rtol': 1e-8}), ('RungeKutta', {'dt': 1e-2}),
+  ('Verlet', {'dt': 1e-2})])
+def test_dense_then_advance(method, options):
+  # dense() ends in the state the run reached, so the next run continues
+  # it as advance() would
+  if method == 'Verlet':
+    f = lambda t, q: -q
+    y0 = [[1., 0.]]
+  else:
+    f = vdp
+    y0 = [2., 0.]
+  s = Stepper(f, 0., y0, method, **options)
+  r = Stepper(f, 0., y0, method, **options)
+  y = s.dense(linspace(0., 1., 7))
+  assert (y[-1] == r.advance(1.)).all()
+  assert (s.y == r.y).all() and s.t == r.t
+  assert (s.advance(2.) == r.advance(2.)).all()
+
+@pytest.mark.parametrize('method', ['RungeKutta45', 'Tsitouras45', 'Adams',
+                                    'BulirschStoer', 'RungeKutta'])
+def test_scipy_ode_complex(method):
+  # y' = -iy through scipy's ode, which casts y0 to the integrator's scalar
+  r = ode(lambda t, y: -y).set_integrator(method, rtol=1e-10, dt=1e-3)
+  r.set_initial_value([1.], 0.)
+  assert r.integrate(1.).dtype == float
+  r = ode(lambda t, y: -1j*y).set_integrator(method, rtol=1e-10, dt=1e-3)
+  r.set_initial_value([1. + 0j], 0.)
+  y = r.integrate(1.)
+  assert y.dtype == complex
+  assert abs(y[0] - exp(-1j)) < 1e-4
+
+@pytest.mark.parametrize('method', ['BDF', 'Verlet'])
+def test_scipy_ode_complex_rejected(method):
+  r = ode(lambda t, y: -1j*y).set_integrator(method)
+  r.set_initial_value([[1. + 0j, 0.]], 0.)
+  with pytest.raises(TypeError):
+    r.integrate(1.)
+
+@pytest.mark.parametrize('method', ['Adams', 'RungeKutta45', 'BDF'])
+def test_zero_length_run(method):
+  s = Stepper(vdp, 0., [2., 0.], method, rtol=1e-8)
+  r = Stepper(vdp, 0., [2., 0.], method, rtol=1e-8)
+  assert (s.advance(0.) == [2., 0.]).all()
+  assert (s.advance(1.) == r.advance(1.)).all()
+  assert s.success
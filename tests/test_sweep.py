@@ -0,0 +1,44 @@
+"""
+sweep() solves every member as a lone Stepper would, in order, whatever
+the number of workers.
+"""
+from numpy import array, linspace, exp
+from ode_solvers import sweep, Stepper
+
+def oscillator(t, y, k, c):
+  return array([y[1], -k*y[0] - c*y[1]])
+
+def rotation(t, y, w):
+  return -1j*w*y
+
+t_eval = linspace(0., 5., 11)
+params = [(k, c) for k in (1., 2., 4.) for c in (0., .1, .5)]
+
+def test_workers():
+  y0 = array([[1., float(j)] for j in range(len(params))])
+  y, success = sweep(oscillator, y0, t_eval, 'RungeKutta45', params,
+                     workers=1, rtol=1e-8)
+  assert y.shape == (9, 11, 2) and success.all()
+  for j, p in enumerate(params):
+    s = Stepper(oscillator, 0., y0[j], 'RungeKutta45', p, rtol=1e-8)
+    assert (y[j] == s.dense(t_eval)).all()
+  z, success = sweep(oscillator, y0, t_eval, 'RungeKutta45', params,
+                     workers=2, chunksize=2, rtol=1e-8)
+  assert (z == y).all() and success.all()
+
+def test_single_state():
+  # one initial value for every member, and a single member
+  y, success = sweep(oscillator, [1., 0.], t_eval, 'RungeKutta', params,
+                     workers=2, dt=1e-2)
+  assert y.shape == (9, 11, 2)
+  assert (y[0] == Stepper(oscillator, 0., [1., 0.], 'RungeKutta', params[0],
+                          dt=1e-2).dense(t_eval)).all()
+  y, success = sweep(oscillator, [1., 0.], t_eval, 'RungeKutta',
+                     [params[0]], workers=1, dt=1e-2)
+  assert y.shape == (1, 11, 2)
+
+def test_complex():
+  y, success = sweep(rotation, [1. + 0j], t_eval, 'RungeKutta45',
+                     [(1.,), (2.,)], workers=2, rtol=1e-10, atol=1e-12)
+  assert y.dtype == complex and success.all()
+  assert abs(y[:,:,0] - exp(-1j*array([[1.], [2.]])*t_eval)).max() < 1e-8
@@ -0,0 +1,35 @@
+"""
+trajectory() of scipy ode objects, in one pass or integrating to every
+output time.
+"""
+import pytest
+from numpy import array, linspace, pi
+from scipy.integrate import ode
+from ode_solvers import trajectory, Stepper
+
+def oscillator(t, y):
+  return array([y[1], -y[0]])
+
+t_eval = linspace(0., 3., 7)
+
+@pytest.mark.parametrize('method', ['RungeKutta45', 'RungeKutta', 'Adams',
+                                    'BDF', 'BulirschStoer'])
+def test_trajectory(method):
+  r = ode(oscillator).set_integrator(method, rtol=1e-8)
+  r.set_initial_value([1, 0], 0.)
+  y = trajectory(r, t_eval)
+  s = Stepper(oscillator, 0., [1., 0.], method, rtol=1e-8)
+  assert (y == s.dense(t_eval)).all()
+  assert r.t == 3. and (r.y == y[-1]).all()
+
+@pytest.mark.parametrize('method', ['RungeKutta45', 'RungeKutta'])
+def test_terminal_event(method):
+  def event(t, y):
+    return y[0]
+  event.terminal = True
+  r = ode(oscillator).set_integrator(method, rtol=1e-10, atol=1e-12,
+                                     events=event)
+  r.set_initial_value([1., 0.], 0.)
+  y = trajectory(r, t_eval)
+  assert len(y) == 4
+  assert abs(r.t - pi/2) < 1e-8 and abs(r.y[0]) < 1e-8